@@ -0,0 +1,128 @@
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Dict, Any, List, Optional
+
+import deadline
+from admission import ActiveSlots
+from circuit_breaker import CircuitBreakerRegistry
+from hashring import HashRing
+from magnet import parse_magnet
+from rate_limit import TokenBucket
+from rd_api import RealDebridAPI
+
+# Real-Debrid allows 250 requests per minute per token
+RD_REQUESTS_PER_SECOND = 250 / 60
+
+PLACEMENT_LEAST_LOADED = 'least_loaded'
+PLACEMENT_HASH = 'hash'
+
+
+def account_name(api_key: str) -> str:
+    """Stable, non-secret identifier for an API key"""
+    return hashlib.sha1(api_key.encode('utf-8')).hexdigest()[:8]
+
+
+class Account:
+    """A Real-Debrid API key with its own client, rate limiter, circuit breakers and slot tracking"""
+
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        self.name = account_name(api_key)
+        self.rate_limiter = TokenBucket(RD_REQUESTS_PER_SECOND, capacity=10)
+        # Per account, so a locked or throttled key does not short-circuit the others
+        self.breakers = CircuitBreakerRegistry(failure_rate=0.5, min_calls=3, window=10, reset_timeout=120)
+        self.api = RealDebridAPI(api_key, breakers=self.breakers, rate_limiter=self.rate_limiter)
+        self.slots = ActiveSlots()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.slots.to_dict(), name=self.name)
+
+
+class AccountPool:
+    """
+    Set of Real-Debrid accounts that new magnets are sharded across, either
+    by consistent hashing of the magnet or by placing it on the account with
+    the most free slots.
+    """
+
+    def __init__(self, api_keys: List[str], placement: str = PLACEMENT_LEAST_LOADED):
+        self.api_keys = list(api_keys)
+        self.placement = placement
+        self.accounts: Dict[str, Account] = {}
+        for key in self.api_keys:
+            account = Account(key)
+            self.accounts[account.name] = account
+        self.ring = HashRing(self.accounts)
+        # Scheduled jobs (file selection, slot refreshes) get their own workers, so
+        # interactive API calls never queue behind a pass that can run for a job deadline
+        self._executor = ThreadPoolExecutor(max_workers=max(1, len(self.accounts)),
+                                            thread_name_prefix='rd-account')
+        self._background_executor = ThreadPoolExecutor(max_workers=max(1, len(self.accounts)),
+                                                       thread_name_prefix='rd-account-job')
+
+    def __len__(self) -> int:
+        return len(self.accounts)
+
+    def get(self, name: str) -> Optional[Account]:
+        return self.accounts.get(name)
+
+    def primary(self) -> Optional[Account]:
+        return next(iter(self.accounts.values()), None)
+
+    def map(self, func: Callable[[Account], Any], accounts: List[Account] = None,
+            background: bool = False) -> Dict[str, Any]:
+        """
+        Call `func` for each account concurrently, returning results keyed by
+        account name. Calls still outstanding at the deadline are cancelled
+        and reported as None. Scheduled jobs pass background=True to run on
+        the workers reserved for them.
+        """
+        accounts = list(self.accounts.values()) if accounts is None else accounts
+        if len(accounts) == 1:
+            return {accounts[0].name: func(accounts[0])}
+        executor = self._background_executor if background else self._executor
+        futures = {account.name: deadline.submit(executor, func, account) for account in accounts}
+        _, not_done = wait(futures.values(), timeout=deadline.remaining())
+        results = {}
+        for name, future in futures.items():
+            if future in not_done:
+                future.cancel()
+                logging.error(str(deadline.exceeded(f"Real-Debrid account {name}")))
+                results[name] = None
+                continue
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                logging.error(f"Error calling Real-Debrid account {name}: {str(e)}")
+                results[name] = None
+        return results
+
+    def refresh_slots(self, force: bool = False):
+        self.map(lambda account: account.slots.refresh(account.api, force=force), background=True)
+
+    def place(self, magnet: str) -> Optional[Account]:
+        """Pick the account for a new magnet, or None if every account is full"""
+        candidates = [account for account in self.accounts.values() if account.slots.free() > 0]
+        if not candidates:
+            return None
+        if self.placement == PLACEMENT_HASH:
+            # Hash the info hash so the same torrent maps to the same account whatever its trackers
+            parsed = parse_magnet(magnet)
+            for name in self.ring.walk(parsed.key if parsed else magnet):
+                account = self.accounts[name]
+                if account.slots.free() > 0:
+                    return account
+        return max(candidates, key=lambda account: account.slots.free())
+
+    def to_dict(self) -> List[Dict[str, Any]]:
+        return [account.to_dict() for account in self.accounts.values()]
+
+    def breakers_snapshot(self) -> List[Dict[str, Any]]:
+        """Circuit breakers of every account, named '<account>/rd:<group>'"""
+        return [dict(breaker, name=f"{account.name}/{breaker['name']}")
+                for account in self.accounts.values() for breaker in account.breakers.snapshot()]
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+        self._background_executor.shutdown(wait=False)
@@ -0,0 +1,219 @@
+import heapq
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from typing import Optional, Dict, Any, List, Callable
+
+import deadline
+from magnet import parse_magnet
+from rd_api import ADD_REJECTED
+
+
+def magnet_key(magnet_or_key: str) -> str:
+    """The Magnet.key of a magnet link; anything else (a key, an unparsable link) is used as is"""
+    if magnet_or_key.startswith('magnet:'):
+        parsed = parse_magnet(magnet_or_key)
+        if parsed is not None:
+            return parsed.key
+    return magnet_or_key
+
+
+class ActiveSlots:
+    """
+    Cached view of the account's active-torrent count and limit.
+
+    The count is refreshed from Real-Debrid at most every `refresh_interval`
+    seconds; in between, successful additions are counted locally so a drain
+    does not need an API call per torrent.
+    """
+
+    def __init__(self, refresh_interval: float = 60):
+        self.refresh_interval = refresh_interval
+        self.active = None
+        self.limit = None
+        self._refreshed_at = 0.0
+
+    def refresh(self, rd_api, force: bool = False) -> bool:
+        if not force and self.limit is not None and time.monotonic() - self._refreshed_at < self.refresh_interval:
+            return True
+        info = rd_api.get_active_torrents_limits()
+        if not info or 'limit' not in info:
+            return False
+        self.active = info.get('nb', 0)
+        self.limit = info['limit']
+        self._refreshed_at = time.monotonic()
+        return True
+
+    def free(self) -> int:
+        if self.limit is None:
+            return 0
+        return max(0, self.limit - self.active)
+
+    def consume(self):
+        if self.active is not None:
+            self.active += 1
+
+    def mark_full(self):
+        """Assume no free slots until the next refresh, e.g. after a rejected addition"""
+        if self.limit is not None:
+            self.active = self.limit
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'active': self.active, 'limit': self.limit}
+
+
+class AdmissionQueue:
+    """
+    Persistent, priority-ordered queue of magnets waiting for a free
+    Real-Debrid slot. Higher priorities drain first, FIFO within a priority.
+    Items are keyed by info hash, so the same torrent is only queued once
+    whatever trackers or name its links carry.
+    Magnets Real-Debrid keeps refusing are parked in `failed` after
+    `max_attempts` so they do not hold up the rest of the queue.
+    """
+
+    def __init__(self, queue_file: str = 'config/queue.json', max_attempts: int = 3, max_failed: int = 500):
+        self.queue_file = queue_file
+        self.max_attempts = max_attempts
+        self.max_failed = max_failed
+        self._lock = threading.RLock()
+        # Held for a whole drain; _lock is only held between Real-Debrid calls
+        self._drain_lock = threading.Lock()
+        # Items taken off the heap while their addition is in progress
+        self._in_flight: Dict[str, Dict[str, Any]] = {}
+        self._heap = []
+        self._items: Dict[str, Dict[str, Any]] = {}
+        self.failed: List[Dict[str, Any]] = []
+        self._counter = itertools.count()
+        self.load()
+
+    def load(self):
+        with self._lock:
+            self._heap = []
+            self._items = {}
+            self.failed = []
+            if os.path.exists(self.queue_file):
+                with open(self.queue_file, 'r') as f:
+                    data = json.load(f)
+                # Older files hold just the list of queued items
+                if isinstance(data, list):
+                    data = {'items': data}
+                # Items are stored in drain order, so re-pushing keeps FIFO order
+                for item in data.get('items', []):
+                    self._push_item(item)
+                self.failed = data.get('failed', [])
+                for item in self.failed:
+                    item.setdefault('key', magnet_key(item['magnet']))
+
+    def save(self):
+        with self._lock:
+            with open(self.queue_file, 'w') as f:
+                json.dump({'items': self.items(), 'failed': self.failed}, f)
+
+    def _push_item(self, item: Dict[str, Any]):
+        # Items saved before they carried a key get one here
+        key = item.setdefault('key', magnet_key(item['magnet']))
+        self._items[key] = item
+        heapq.heappush(self._heap, (-item.get('priority', 0), next(self._counter), key))
+
+    def __contains__(self, magnet_or_key: str) -> bool:
+        """Accepts a magnet link or a Magnet.key"""
+        key = magnet_key(magnet_or_key)
+        # Parked magnets count too, or every poll of their feed would queue them again
+        return (key in self._items or key in self._in_flight
+                or any(item.get('key') == key for item in self.failed))
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def items(self) -> List[Dict[str, Any]]:
+        """Queued items in the order they will be admitted"""
+        with self._lock:
+            return [self._items[key] for _, _, key in sorted(self._heap)]
+
+    def push(self, magnet: str, priority: int = 0, feed: Optional[str] = None) -> bool:
+        """Queue a magnet, returning False if it is already queued"""
+        key = magnet_key(magnet)
+        with self._lock:
+            if key in self._items or key in self._in_flight:
+                return False
+            self._push_item({
+                'magnet': magnet,
+                'key': key,
+                'priority': priority,
+                'feed': feed,
+                'queued_at': time.time()
+            })
+            return True
+
+    def drain(self, pool, on_added: Callable[[Dict[str, Any], str, Any], None]) -> int:
+        """
+        Add queued magnets while any account in `pool` has free slots.
+        `on_added` is called with the queue item, the new torrent id and the
+        owning account. Returns the number of torrents added; the queue is
+        persisted if anything changed.
+
+        The queue lock is not held across Real-Debrid calls, so pushes (a
+        WebSub callback, say) never wait for a drain: each item is taken off
+        the heap, added without the lock, then committed or put back.
+        """
+        added = 0
+        changed = False
+        retry = []
+        with self._drain_lock:
+            with self._lock:
+                if not self._heap:
+                    return 0
+                head = self._items[self._heap[0][2]]['magnet']
+            pool.refresh_slots()
+            if pool.place(head) is None:
+                # Cached counts may be stale; slots could have freed up since
+                pool.refresh_slots(force=True)
+            while not deadline.expired():
+                with self._lock:
+                    if not self._heap:
+                        break
+                    entry = self._heap[0]
+                    key = entry[2]
+                    item = self._items[key]
+                    account = pool.place(item['magnet'])
+                    if account is None:
+                        break
+                    heapq.heappop(self._heap)
+                    del self._items[key]
+                    self._in_flight[key] = item
+                torrent_id, error = account.api.add_magnet_result(item['magnet'])
+                with self._lock:
+                    del self._in_flight[key]
+                    if error == ADD_REJECTED:
+                        item['attempts'] = item.get('attempts', 0) + 1
+                        if item['attempts'] >= self.max_attempts:
+                            logging.warning(f"Real-Debrid rejected queued magnet {item['attempts']} times, "
+                                            f"giving up on it: {item['magnet']}")
+                            item['failed_at'] = time.time()
+                            self.failed = (self.failed + [item])[-self.max_failed:]
+                        else:
+                            # Try again on a later drain, behind the other items of its priority
+                            retry.append(item)
+                        changed = True
+                        continue
+                    if not torrent_id:
+                        logging.warning(f"Adding queued magnet to account {account.name} failed, "
+                                        "skipping the account until its next refresh")
+                        account.slots.mark_full()
+                        # The original heap entry keeps its place in line
+                        self._items[key] = item
+                        heapq.heappush(self._heap, entry)
+                        continue
+                    account.slots.consume()
+                    added += 1
+                on_added(item, torrent_id, account)
+            with self._lock:
+                for item in retry:
+                    self._push_item(item)
+                if added or changed:
+                    self.save()
+        return added
@@ -0,0 +1,94 @@
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+from typing import Dict, Optional
+
+from flask import Response, abort, request, url_for
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Fingerprinted names change whenever the content does, so browsers may keep them forever
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+
+
+class Asset:
+    def __init__(self, name: str, content: bytes):
+        self.name = name
+        self.digest = hashlib.sha256(content).hexdigest()[:12]
+        root, ext = os.path.splitext(name)
+        self.fingerprinted = f"{root}.{self.digest}{ext}"
+        self.mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        self.etag = f'"{self.digest}"'
+        self.encodings = {'identity': content}
+        if self.mimetype.startswith(COMPRESSIBLE_TYPES):
+            self.encodings['gzip'] = gzip.compress(content, compresslevel=9, mtime=0)
+            if brotli is not None:
+                self.encodings['br'] = brotli.compress(content, quality=11)
+
+
+class AssetPipeline:
+    """
+    Builds content-hashed, precompressed copies of the static files at
+    startup and serves them from memory with immutable cache headers.
+    Templates reference them with asset_url('script.js').
+    """
+
+    def __init__(self, app=None):
+        self.assets: Dict[str, Asset] = {}
+        self.by_fingerprint: Dict[str, Asset] = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.build(app.static_folder)
+        app.add_url_rule('/assets/<path:filename>', 'asset', self.serve)
+        app.context_processor(lambda: {'asset_url': self.url_for})
+
+    def build(self, static_folder: str):
+        self.assets.clear()
+        self.by_fingerprint.clear()
+        for root, _, files in os.walk(static_folder):
+            for filename in files:
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, static_folder).replace(os.sep, '/')
+                with open(path, 'rb') as f:
+                    asset = Asset(name, f.read())
+                self.assets[name] = asset
+                self.by_fingerprint[asset.fingerprinted] = asset
+        logging.info(f"Built {len(self.assets)} static assets")
+
+    def url_for(self, name: str) -> str:
+        asset = self.assets.get(name)
+        if asset is None:
+            # Unknown files fall back to the regular, uncached static route
+            return url_for('static', filename=name)
+        return url_for('asset', filename=asset.fingerprinted)
+
+    @staticmethod
+    def _choose_encoding(asset: Asset) -> str:
+        for encoding in ('br', 'gzip'):
+            if encoding in asset.encodings and request.accept_encodings[encoding]:
+                return encoding
+        return 'identity'
+
+    def serve(self, filename: str) -> Response:
+        asset: Optional[Asset] = self.by_fingerprint.get(filename)
+        if asset is None:
+            abort(404)
+        headers = {
+            'Cache-Control': IMMUTABLE_CACHE_CONTROL,
+            'ETag': asset.etag,
+            'Vary': 'Accept-Encoding'
+        }
+        if request.if_none_match.contains_weak(asset.digest):
+            return Response(status=304, headers=headers)
+        encoding = self._choose_encoding(asset)
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        return Response(asset.encodings[encoding], mimetype=asset.mimetype, headers=headers)
@@ -0,0 +1,133 @@
+import threading
+import time
+import logging
+from collections import deque
+from typing import Dict, Any, Optional
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker with closed, open and half-open states.
+
+    While closed, outcomes are recorded in a sliding window. Once the window
+    holds at least `min_calls` outcomes and the failure rate reaches
+    `failure_rate`, the breaker opens and rejects calls for `reset_timeout`
+    seconds. After that it lets up to `half_open_probes` calls through; a
+    successful probe closes it again, a failed one reopens it.
+    """
+
+    def __init__(self, name: str, failure_rate: float = 0.5, min_calls: int = 4,
+                 window: int = 20, reset_timeout: float = 300, half_open_probes: int = 1):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self._outcomes = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self):
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._probes_in_flight = 0
+            logging.info(f"Circuit '{self.name}' half-open, probing")
+
+    def allow_request(self) -> bool:
+        """Return True if a call may go through, reserving a probe slot when half-open"""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                return True
+            self._rejected += 1
+            return False
+
+    def release(self):
+        """Give back a probe slot reserved by allow_request() for a call that was abandoned"""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes_in_flight > 0:
+                self._probes_in_flight -= 1
+
+    def record_success(self):
+        with self._lock:
+            if self._state == HALF_OPEN:
+                logging.info(f"Circuit '{self.name}' closed after successful probe")
+                self._state = CLOSED
+                self._outcomes.clear()
+            self._outcomes.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._open()
+                return
+            self._outcomes.append(False)
+            if len(self._outcomes) >= self.min_calls and self._current_failure_rate() >= self.failure_rate:
+                self._open()
+
+    def _open(self):
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._probes_in_flight = 0
+        logging.warning(f"Circuit '{self.name}' opened, skipping calls for {self.reset_timeout}s")
+
+    def _current_failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            self._maybe_half_open()
+            retry_in = None
+            if self._state == OPEN:
+                retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+            return {
+                'name': self.name,
+                'state': self._state,
+                'failure_rate': round(self._current_failure_rate(), 3),
+                'calls': len(self._outcomes),
+                'rejected': self._rejected,
+                'retry_in': retry_in,
+            }
+
+
+class CircuitBreakerRegistry:
+    """Lazily creates one breaker per name, sharing the same settings"""
+
+    def __init__(self, **breaker_kwargs):
+        self.breaker_kwargs = breaker_kwargs
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(name)
+                if breaker is None:
+                    breaker = CircuitBreaker(name, **self.breaker_kwargs)
+                    self._breakers[name] = breaker
+        return breaker
+
+    def find(self, name: str) -> Optional[CircuitBreaker]:
+        return self._breakers.get(name)
+
+    def snapshot(self):
+        return [breaker.to_dict() for breaker in list(self._breakers.values())]
@@ -0,0 +1,81 @@
+"""
+Command line entry point.
+
+    python cli.py [serve]   web UI plus the scheduled jobs (the default)
+    python cli.py daemon    scheduled jobs only, without loading Flask
+    python cli.py once      run a single cycle and exit, e.g. from cron
+
+The web stack is only imported in serve mode.
+"""
+import argparse
+import logging
+import signal
+import sys
+
+
+def serve(args):
+    # Importing main builds the Flask app, login manager and asset pipeline
+    import main
+    from auth import init_auth
+    init_auth()
+    main.init_warm_start()
+    main.init_cluster(args.cluster_store, args.node_id)
+    main.schedule_jobs(main.scheduler, feed_interval=args.interval)
+    main.scheduler.start()
+    main.app.run(host=args.host, port=args.port)
+
+
+def daemon(args):
+    from apscheduler.schedulers.blocking import BlockingScheduler
+    import pipeline
+
+    pipeline.init_warm_start()
+    pipeline.init_cluster(args.cluster_store, args.node_id)
+    scheduler = BlockingScheduler()
+    # WebSub callbacks need the web server, so every feed is polled instead
+    pipeline.schedule_jobs(scheduler, push_enabled=False, feed_interval=args.interval)
+
+    logging.info(f"Running headless, checking feeds every {args.interval} minutes")
+    if args.run_now:
+        pipeline.run_cycle(push_enabled=False)
+    try:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        if scheduler.running:
+            scheduler.shutdown(wait=False)
+
+
+def once(args):
+    import pipeline
+    pipeline.init_warm_start()
+    pipeline.init_cluster(args.cluster_store, args.node_id)
+    pipeline.run_cycle(push_enabled=False)
+    return 0
+
+
+def stop(signum, frame):
+    raise SystemExit(0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='RSS feeds to Real-Debrid')
+    parser.add_argument('mode', nargs='?', choices=('serve', 'daemon', 'once'), default='serve')
+    parser.add_argument('--interval', type=int, default=60, help='minutes between feed checks')
+    parser.add_argument('--run-now', action='store_true', help='daemon: run a cycle immediately at startup')
+    parser.add_argument('--cluster-store', help='shared SQLite file; enables cluster mode')
+    parser.add_argument('--node-id', help='name of this instance in the cluster (default: hostname)')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=10500)
+    parser.add_argument('--log-level', default='INFO')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level.upper(), format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    # Exit through SystemExit on SIGTERM so atexit handlers (snapshot, cluster leave) run
+    signal.signal(signal.SIGTERM, stop)
+    return {'serve': serve, 'daemon': daemon, 'once': once}[args.mode](args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,155 @@
+import logging
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from hashring import HashRing
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS members (
+    node_id TEXT PRIMARY KEY,
+    started_at REAL NOT NULL,
+    heartbeat REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS claims (
+    key TEXT PRIMARY KEY,
+    node_id TEXT NOT NULL,
+    claimed_at REAL NOT NULL
+);
+'''
+
+
+class ClusterStore:
+    """
+    Shared state of a cluster in a SQLite file. Every instance opens the same
+    file (on a shared volume); SQLite's file locking makes each statement
+    atomic across processes. The default rollback journal is kept because
+    WAL does not work on network filesystems.
+    """
+
+    def __init__(self, path: str, timeout: float = 30):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._conn.executescript(SCHEMA)
+
+    def heartbeat(self, node_id: str, started_at: float, now: float):
+        with self._lock:
+            self._conn.execute(
+                'INSERT INTO members (node_id, started_at, heartbeat) VALUES (?, ?, ?) '
+                'ON CONFLICT(node_id) DO UPDATE SET heartbeat = excluded.heartbeat',
+                (node_id, started_at, now))
+
+    def members(self, alive_since: float) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute('SELECT node_id FROM members WHERE heartbeat >= ? ORDER BY node_id',
+                                      (alive_since,)).fetchall()
+        return [row[0] for row in rows]
+
+    def prune_members(self, alive_since: float) -> int:
+        with self._lock:
+            return self._conn.execute('DELETE FROM members WHERE heartbeat < ?', (alive_since,)).rowcount
+
+    def remove_member(self, node_id: str):
+        with self._lock:
+            self._conn.execute('DELETE FROM members WHERE node_id = ?', (node_id,))
+
+    def claim(self, key: str, node_id: str, now: float) -> bool:
+        """Atomically claim `key`; True only for the first node to ask"""
+        with self._lock:
+            cursor = self._conn.execute('INSERT OR IGNORE INTO claims (key, node_id, claimed_at) VALUES (?, ?, ?)',
+                                        (key, node_id, now))
+            return cursor.rowcount == 1
+
+    def prune_claims(self, older_than: float) -> int:
+        with self._lock:
+            return self._conn.execute('DELETE FROM claims WHERE claimed_at < ?', (older_than,)).rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ClusterMember:
+    """
+    This instance's membership in a cluster. Live members (those with a
+    recent heartbeat) form a consistent hash ring over which the feeds are
+    partitioned, so each feed is polled by exactly one instance and only
+    about 1/N of the feeds move when an instance joins or leaves. Torrents
+    are claimed in the store before being queued so two instances never
+    add the same one.
+    """
+
+    def __init__(self, store: ClusterStore, node_id: Optional[str] = None, member_ttl: float = 90,
+                 claim_ttl: float = 30 * 24 * 3600):
+        self.store = store
+        self.node_id = node_id or socket.gethostname()
+        self.member_ttl = member_ttl
+        self.claim_ttl = claim_ttl
+        self.started_at = time.time()
+        self.members: List[str] = []
+        self.ring = HashRing()
+        self._lock = threading.Lock()
+
+    def heartbeat(self) -> List[str]:
+        """Renew this instance's membership and rebuild the ring if the live members changed"""
+        now = time.time()
+        try:
+            self.store.heartbeat(self.node_id, self.started_at, now)
+            members = self.store.members(now - self.member_ttl)
+        except sqlite3.Error as e:
+            # Keep the last known ring; the other members do the same for us until our entry expires
+            logging.error(f"Error updating cluster membership: {str(e)}")
+            return self.members
+        with self._lock:
+            if members != self.members:
+                logging.info(f"Cluster membership changed: {', '.join(members)}")
+                self.members = members
+                self.ring = HashRing(members)
+        return members
+
+    def maintain(self):
+        """Heartbeat plus housekeeping of dead members and old claims"""
+        self.heartbeat()
+        now = time.time()
+        try:
+            self.store.prune_members(now - 10 * self.member_ttl)
+            self.store.prune_claims(now - self.claim_ttl)
+        except sqlite3.Error as e:
+            logging.error(f"Error pruning cluster state: {str(e)}")
+
+    def owns(self, feed: str) -> bool:
+        owner = self.ring.get(feed)
+        return owner is None or owner == self.node_id
+
+    def assigned(self, feeds: Iterable[str]) -> List[str]:
+        """The subset of `feeds` this instance is responsible for"""
+        return [feed for feed in feeds if self.owns(feed)]
+
+    def claim(self, key: str) -> bool:
+        """
+        Claim a torrent for this instance. If the store is unreachable the
+        claim fails, and the entry is tried again on the next cycle.
+        """
+        try:
+            return self.store.claim(key, self.node_id, time.time())
+        except sqlite3.Error as e:
+            logging.error(f"Error claiming {key}: {str(e)}")
+            return False
+
+    def leave(self):
+        """Drop out of the ring right away instead of waiting for the heartbeat to expire"""
+        try:
+            self.store.remove_member(self.node_id)
+        except sqlite3.Error as e:
+            logging.error(f"Error leaving the cluster: {str(e)}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'node_id': self.node_id,
+            'store': self.store.path,
+            'members': list(self.members)
+        }
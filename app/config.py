@@ -1,48 +1,219 @@
+import copy
 import json
 import os
+import threading
+from opml import normalize_feed_url
+
+
+class FrozenDict(dict):
+    """dict that refuses mutation; still JSON-serializable like the settings it mirrors"""
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError('Config snapshots are read-only; use the Config setters')
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _immutable
+
+
+def freeze(value):
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class ConfigSnapshot:
+    """
+    Immutable, versioned view of the settings. Readers take one snapshot and
+    use it for a whole cycle or request without locking; writers publish a
+    new snapshot instead of changing this one.
+    """
+
+    def __init__(self, version, settings):
+        self.version = version
+        self.settings = freeze(settings)
+        self.feeds = self.settings['feeds']
+        self.feed_set = frozenset(normalize_feed_url(url) for url in self.feeds)
+
+    def get(self, key, default=None):
+        return self.settings.get(key, default)
+
+    def feed_priority(self, url):
+        return self.settings.get('feed_priorities', {}).get(url, 0)
+
+    def rd_api_keys(self):
+        keys = self.settings.get('rd_api_keys')
+        if keys:
+            return keys
+        return (self.settings['rd_api_key'],) if self.settings.get('rd_api_key') else ()
+
 
 class Config:
     def __init__(self):
         self.config_file = 'config/settings.json'
+        self._write_lock = threading.Lock()
         self.load_config()
 
     def load_config(self):
         if not os.path.exists('config'):
             os.makedirs('config')
         if not os.path.exists(self.config_file):
-            self.config = {'feeds': [], 'rd_api_key': '', 'api_methods': {}}
+            settings = {'feeds': [], 'rd_api_key': '', 'api_methods': {}}
+            self._publish(settings, 1)
             self.save_config()
         else:
             with open(self.config_file, 'r') as f:
-                self.config = json.load(f)
+                settings = json.load(f)
+            self._publish(settings, 1)
+
+    def _publish(self, settings, version):
+        self._settings = settings
+        # A single attribute assignment, so readers see either the old or the new snapshot
+        self._snapshot = ConfigSnapshot(version, settings)
 
     def save_config(self):
         with open(self.config_file, 'w') as f:
-            json.dump(self.config, f)
+            json.dump(self._settings, f)
+
+    def snapshot(self):
+        return self._snapshot
+
+    @property
+    def version(self):
+        return self._snapshot.version
+
+    def _update(self, mutate):
+        """
+        Copy the current settings, apply `mutate` to the copy, persist it and
+        publish it as the next snapshot. Returns whatever `mutate` returns;
+        nothing is written if it returns False.
+        """
+        with self._write_lock:
+            settings = copy.deepcopy(self._settings)
+            result = mutate(settings)
+            if result is False:
+                return result
+            tmp_file = self.config_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(settings, f)
+            os.replace(tmp_file, self.config_file)
+            self._publish(settings, self._snapshot.version + 1)
+            return result
+
+    def _set(self, key, value):
+        def mutate(settings):
+            settings[key] = value
+        self._update(mutate)
 
     def get_feeds(self):
-        return self.config['feeds']
+        return self._snapshot.feeds
+
+    def has_feed(self, url):
+        return normalize_feed_url(url) in self._snapshot.feed_set
 
     def add_feed(self, url):
-        if url not in self.config['feeds']:
-            self.config['feeds'].append(url)
-            self.save_config()
+        return bool(self.add_feeds([url]))
+
+    def add_feeds(self, urls):
+        """Add every feed not already configured with a single write, returning the added URLs"""
+        def mutate(settings):
+            known = set(self._snapshot.feed_set)
+            added = []
+            for url in urls:
+                url = normalize_feed_url(url) if url else ''
+                if url and url not in known:
+                    known.add(url)
+                    settings['feeds'].append(url)
+                    added.append(url)
+            return added or False
+        return self._update(mutate) or []
 
     def remove_feed(self, index):
-        if 0 <= index < len(self.config['feeds']):
-            self.config['feeds'].pop(index)
-            self.save_config()
+        def mutate(settings):
+            if not 0 <= index < len(settings['feeds']):
+                return False
+            url = settings['feeds'].pop(index)
+            settings.get('feed_priorities', {}).pop(url, None)
+        self._update(mutate)
 
     def get_rd_api_key(self):
-        return self.config['rd_api_key']
+        return self._snapshot.get('rd_api_key')
 
     def set_rd_api_key(self, key):
-        self.config['rd_api_key'] = key
-        self.save_config()
+        self.set_rd_api_keys([key] if key else [])
+
+    def get_rd_api_keys(self):
+        return self._snapshot.rd_api_keys()
+
+    def set_rd_api_keys(self, keys):
+        keys = list(dict.fromkeys(key.strip() for key in keys if key.strip()))
+
+        def mutate(settings):
+            settings['rd_api_keys'] = keys
+            # Keep the single-key setting pointing at the primary account
+            settings['rd_api_key'] = keys[0] if keys else ''
+        self._update(mutate)
+
+    def get_account_placement(self):
+        return self._snapshot.get('account_placement', 'least_loaded')
 
     def get_api_methods(self):
-        return self.config['api_methods']
+        return self._snapshot.get('api_methods')
 
     def set_api_methods(self, methods):
-        self.config['api_methods'] = methods
-        self.save_config()
+        self._set('api_methods', methods)
+
+    def get_feed_priority(self, url):
+        return self._snapshot.feed_priority(url)
+
+    def set_feed_priority(self, url, priority):
+        def mutate(settings):
+            settings.setdefault('feed_priorities', {})[url] = priority
+        self._update(mutate)
+
+    def get_public_url(self):
+        """Externally reachable base URL of this instance, needed for WebSub callbacks"""
+        return self._snapshot.get('public_url', '')
+
+    def set_public_url(self, url):
+        self._set('public_url', url)
+
+    def get_file_selection(self):
+        """Rules for FileSelectionRules: extensions, min_size_mb, largest_n, exclude_patterns"""
+        return self._snapshot.get('file_selection', {})
+
+    def set_file_selection(self, rules):
+        self._set('file_selection', rules)
+
+    def get_download_dir(self):
+        return self._snapshot.get('download_dir', 'downloads')
+
+    def get_download_max_rate(self):
+        """Global bandwidth cap for local downloads in bytes per second, 0 for unlimited"""
+        return self._snapshot.get('download_max_rate', 0)
+
+
+class SnapshotCache:
+    """
+    Holds a value derived from the config, such as a client pool or compiled
+    rules, and rebuilds it only when the config version changes. `build` is
+    called with the new snapshot and the previous value so it can reuse it.
+    """
+
+    def __init__(self, config, build):
+        self.config = config
+        self.build = build
+        self._lock = threading.Lock()
+        self._cached = None  # (version, value), replaced as a whole
+
+    def get(self):
+        snapshot = self.config.snapshot()
+        cached = self._cached
+        if cached is not None and cached[0] >= snapshot.version:
+            return cached[1]
+        with self._lock:
+            cached = self._cached
+            if cached is None or cached[0] < snapshot.version:
+                previous = cached[1] if cached is not None else None
+                cached = self._cached = (snapshot.version, self.build(snapshot, previous))
+            return cached[1]
@@ -0,0 +1,112 @@
+"""
+Deadlines and per-endpoint timeouts for outbound calls.
+
+A deadline is set for a whole web request or scheduler cycle and is kept in
+a context variable, so every nested call sees how much time is left without
+it being passed around. Outbound HTTP calls take their (connect, read)
+timeout from timeout_for(), which clamps the configured timeout of the
+endpoint class to the time remaining and raises DeadlineExceeded once it is
+gone.
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+import requests
+
+import metrics
+
+# (connect, read) seconds per endpoint class. A class like 'rd.torrents'
+# falls back to 'rd', then to 'default'.
+DEFAULT_TIMEOUTS: Dict[str, Tuple[float, float]] = {
+    'default': (5, 30),
+    'rd': (5, 20),
+    'feed': (5, 30),
+    'websub': (5, 10),
+    'download': (10, 60)
+}
+
+_timeouts = dict(DEFAULT_TIMEOUTS)
+_deadline: contextvars.ContextVar = contextvars.ContextVar('deadline', default=None)
+
+
+class DeadlineExceeded(requests.Timeout):
+    """The deadline of the current request or cycle passed before the call could finish"""
+
+
+def configure(timeouts: Dict[str, Tuple[float, float]]) -> Dict[str, Tuple[float, float]]:
+    """Override the defaults with settings like {'rd.torrents': [5, 60]}"""
+    global _timeouts
+    merged = dict(DEFAULT_TIMEOUTS)
+    merged.update({name: tuple(value) for name, value in timeouts.items()})
+    _timeouts = merged
+    return merged
+
+
+def base_timeout(endpoint_class: str) -> Tuple[float, float]:
+    name = endpoint_class
+    while name:
+        if name in _timeouts:
+            return _timeouts[name]
+        name = name.rpartition('.')[0]
+    return _timeouts['default']
+
+
+def set_deadline(seconds: float) -> contextvars.Token:
+    """Limit the current context to `seconds` from now; a deadline can only be shortened, never extended"""
+    expires = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        expires = min(expires, current)
+    return _deadline.set(expires)
+
+
+def reset(token: contextvars.Token):
+    _deadline.reset(token)
+
+
+@contextmanager
+def deadline(seconds: float):
+    token = set_deadline(seconds)
+    try:
+        yield
+    finally:
+        reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the deadline, or None without one"""
+    expires = _deadline.get()
+    return None if expires is None else max(0.0, expires - time.monotonic())
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def exceeded(what: str) -> DeadlineExceeded:
+    metrics.inc('deadline.exceeded')
+    return DeadlineExceeded(f"Deadline exceeded: {what}")
+
+
+def check(what: str):
+    if expired():
+        raise exceeded(what)
+
+
+def timeout_for(endpoint_class: str) -> Tuple[float, float]:
+    """(connect, read) timeout for a call to `endpoint_class`, bounded by the deadline"""
+    connect, read = base_timeout(endpoint_class)
+    left = remaining()
+    if left is None:
+        return connect, read
+    if left <= 0:
+        raise exceeded(endpoint_class)
+    return min(connect, left), min(read, left)
+
+
+def submit(executor, fn, *args, **kwargs):
+    """executor.submit() that carries the caller's deadline into the worker thread"""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
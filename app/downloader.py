@@ -0,0 +1,288 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional
+from urllib.parse import unquote, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import deadline
+from rate_limit import TokenBucket
+
+CHUNK_SIZE = 64 * 1024
+DEFAULT_SEGMENT_SIZE = 8 * 1024 * 1024
+SEGMENT_RETRIES = 3
+_CONTENT_RANGE_RE = re.compile(r'bytes \d+-\d+/(\d+)')
+
+
+class DownloadError(Exception):
+    pass
+
+
+def _throttle(limiters: List[TokenBucket], amount: int):
+    for limiter in limiters:
+        limiter.acquire(amount)
+
+
+def _bucket(rate: Optional[float]) -> Optional[TokenBucket]:
+    # The burst must hold at least one chunk or acquire() could never succeed
+    return TokenBucket(rate, capacity=max(rate, CHUNK_SIZE)) if rate else None
+
+
+class DownloadJob:
+    """
+    One file being downloaded. The file is split into fixed-size segments;
+    a bitmap of finished segments is persisted next to the partial file so
+    an interrupted job resumes where it stopped.
+    """
+
+    def __init__(self, url: str, path: str, max_rate: Optional[float] = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.url = url
+        self.path = path
+        self.part_path = path + '.part'
+        self.state_path = path + '.part.json'
+        self.limiter = _bucket(max_rate)
+        self.size: Optional[int] = None
+        self.segment_size = DEFAULT_SEGMENT_SIZE
+        self.done: List[bool] = []
+        self.bytes_done = 0
+        self.status = 'queued'
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._state_lock = threading.Lock()
+
+    @property
+    def segments(self) -> int:
+        return len(self.done)
+
+    def segment_range(self, index: int):
+        start = index * self.segment_size
+        return start, min(self.size, start + self.segment_size) - 1
+
+    def load_state(self) -> bool:
+        """Restore the finished-segment bitmap of an earlier attempt at the same URL and size"""
+        if not (os.path.exists(self.state_path) and os.path.exists(self.part_path)):
+            return False
+        try:
+            with open(self.state_path, 'r') as f:
+                state = json.load(f)
+            if state.get('url') != self.url or state.get('size') != self.size:
+                return False
+            segment_size = int(state['segment_size'])
+            done = [bit == '1' for bit in state['done']]
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            logging.warning(f"Ignoring unreadable resume state {self.state_path}: {str(e)}")
+            return False
+        self.segment_size = segment_size
+        self.done = done
+        self.bytes_done = sum(self.segment_range(i)[1] - self.segment_range(i)[0] + 1
+                              for i, done in enumerate(self.done) if done)
+        return True
+
+    def save_state(self):
+        with self._state_lock:
+            state = {
+                'url': self.url,
+                'size': self.size,
+                'segment_size': self.segment_size,
+                'done': ''.join('1' if done else '0' for done in self.done)
+            }
+            tmp_path = self.state_path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_path)
+
+    def add_progress(self, amount: int):
+        with self._lock:
+            self.bytes_done += amount
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = None
+        if self.started_at:
+            elapsed = (self.finished_at or time.monotonic()) - self.started_at
+        return {
+            'id': self.id,
+            'url': self.url,
+            'path': self.path,
+            'size': self.size,
+            'bytes_done': self.bytes_done,
+            'segments': self.segments,
+            'segments_done': sum(self.done),
+            'status': self.status,
+            'error': self.error,
+            'rate': round(self.bytes_done / elapsed) if elapsed else None
+        }
+
+
+class DownloadManager:
+    """
+    Parallel segmented HTTP downloader. Each job's segments are fetched with
+    Range requests over a shared pool of keep-alive connections and written
+    in place with positioned writes into a preallocated file. Bandwidth can
+    be capped globally and per job.
+    """
+
+    def __init__(self, download_dir: str = 'downloads', workers: int = 8,
+                 max_rate: Optional[float] = None, endpoint_class: str = 'download'):
+        self.download_dir = download_dir
+        self.endpoint_class = endpoint_class
+        self.limiter = _bucket(max_rate)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        # Byte ranges must refer to the stored representation, not a compressed one
+        self.session.headers['Accept-Encoding'] = 'identity'
+        self._segments = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='download-segment')
+        self._jobs_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='download-job')
+        self.jobs: Dict[str, DownloadJob] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def filename_for(url: str) -> str:
+        name = os.path.basename(unquote(urlsplit(url).path))
+        return name or 'download'
+
+    def _free_path(self, filename: str) -> str:
+        """
+        Path for a new job: `filename`, or 'name (n).ext' while an active job
+        writes to it (the two would share a .part file) or a finished file
+        of that name exists
+        """
+        active = {job.path for job in self.jobs.values() if job.status in ('queued', 'downloading')}
+        stem, ext = os.path.splitext(filename)
+        path = os.path.join(self.download_dir, filename)
+        n = 1
+        while path in active or os.path.exists(path):
+            path = os.path.join(self.download_dir, f"{stem} ({n}){ext}")
+            n += 1
+        return path
+
+    def add(self, url: str, filename: Optional[str] = None, max_rate: Optional[float] = None) -> DownloadJob:
+        os.makedirs(self.download_dir, exist_ok=True)
+        filename = os.path.basename(filename or self.filename_for(url))
+        with self._lock:
+            job = DownloadJob(url, self._free_path(filename), max_rate)
+            self.jobs[job.id] = job
+        self._jobs_executor.submit(self._run, job)
+        return job
+
+    def _timeout(self):
+        return deadline.timeout_for(self.endpoint_class)
+
+    def _limiters(self, job: DownloadJob) -> List[TokenBucket]:
+        return [limiter for limiter in (self.limiter, job.limiter) if limiter is not None]
+
+    def _probe(self, job: DownloadJob) -> bool:
+        """Find the file size; returns True if the server honours Range requests"""
+        with self.session.get(job.url, headers={'Range': 'bytes=0-0'}, stream=True, timeout=self._timeout()) as response:
+            response.raise_for_status()
+            match = _CONTENT_RANGE_RE.match(response.headers.get('Content-Range', ''))
+            if response.status_code == 206 and match:
+                job.size = int(match.group(1))
+                return True
+            length = response.headers.get('Content-Length')
+            job.size = int(length) if length and length.isdigit() else None
+            return False
+
+    def _fetch_segment(self, job: DownloadJob, fd: int, index: int):
+        start, end = job.segment_range(index)
+        limiters = self._limiters(job)
+        for attempt in range(1, SEGMENT_RETRIES + 1):
+            offset = start
+            try:
+                with self.session.get(job.url, headers={'Range': f'bytes={start}-{end}'},
+                                      stream=True, timeout=self._timeout()) as response:
+                    if response.status_code != 206:
+                        raise DownloadError(f"Expected a partial response, got HTTP {response.status_code}")
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        _throttle(limiters, len(chunk))
+                        os.pwrite(fd, chunk, offset)
+                        offset += len(chunk)
+                        job.add_progress(len(chunk))
+                if offset != end + 1:
+                    raise DownloadError(f"Segment {index} ended at byte {offset}, expected {end + 1}")
+                job.done[index] = True
+                job.save_state()
+                return
+            except (requests.RequestException, DownloadError) as e:
+                # Discard the partial progress; the whole segment is fetched again
+                job.add_progress(start - offset)
+                if attempt == SEGMENT_RETRIES:
+                    raise
+                logging.warning(f"Retrying segment {index} of {job.path} ({attempt}/{SEGMENT_RETRIES}): {str(e)}")
+
+    def _download_single_stream(self, job: DownloadJob):
+        limiters = self._limiters(job)
+        with self.session.get(job.url, stream=True, timeout=self._timeout()) as response:
+            response.raise_for_status()
+            with open(job.part_path, 'wb') as f:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    _throttle(limiters, len(chunk))
+                    f.write(chunk)
+                    job.add_progress(len(chunk))
+
+    def _download_segmented(self, job: DownloadJob):
+        if not job.load_state():
+            job.done = [False] * max(1, -(-job.size // job.segment_size))
+            job.bytes_done = 0
+            with open(job.part_path, 'wb') as f:
+                if hasattr(os, 'posix_fallocate') and job.size:
+                    os.posix_fallocate(f.fileno(), 0, job.size)
+                else:
+                    f.truncate(job.size)
+            job.save_state()
+        else:
+            logging.info(f"Resuming {job.path}: {sum(job.done)}/{job.segments} segments already done")
+
+        fd = os.open(job.part_path, os.O_WRONLY)
+        try:
+            futures = [self._segments.submit(self._fetch_segment, job, fd, index)
+                       for index, done in enumerate(job.done) if not done]
+            wait(futures)
+            for future in futures:
+                future.result()
+        finally:
+            os.close(fd)
+        if not all(job.done):
+            raise DownloadError(f"{job.segments - sum(job.done)} segments missing")
+
+    def _run(self, job: DownloadJob):
+        job.status = 'downloading'
+        job.started_at = time.monotonic()
+        try:
+            if self._probe(job) and job.size:
+                self._download_segmented(job)
+            else:
+                self._download_single_stream(job)
+            actual = os.path.getsize(job.part_path)
+            if job.size is not None and actual != job.size:
+                raise DownloadError(f"Size mismatch: expected {job.size} bytes, got {actual}")
+            os.replace(job.part_path, job.path)
+            if os.path.exists(job.state_path):
+                os.remove(job.state_path)
+            job.status = 'completed'
+            logging.info(f"Downloaded {job.path} ({actual} bytes)")
+        except (requests.RequestException, DownloadError, OSError) as e:
+            job.status = 'failed'
+            job.error = str(e)
+            logging.error(f"Error downloading {job.url}: {str(e)}")
+        except Exception as e:
+            # e.g. a corrupt .part.json; the job must still end up failed rather than stay 'downloading'
+            job.status = 'failed'
+            job.error = str(e)
+            logging.error(f"Unexpected error downloading {job.url}: {str(e)}")
+        finally:
+            job.finished_at = time.monotonic()
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return [job.to_dict() for job in list(self.jobs.values())]
@@ -0,0 +1,188 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import feedparser
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import DecodeError, ProtocolError, ReadTimeoutError
+
+import deadline
+
+try:
+    import brotli  # noqa: F401 -- lets urllib3 decode Content-Encoding: br
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+
+class FeedTooLarge(requests.RequestException):
+    """The feed body exceeded the fetcher's size cap"""
+
+
+class FetchResult:
+    def __init__(self, url: str, status: int, content: Optional[bytes] = None,
+                 headers: Optional[Dict[str, str]] = None):
+        self.url = url
+        self.status = status
+        self.content = content
+        self.headers = headers or {}
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 304
+
+
+def iter_body(response: requests.Response, chunk_size: int, what: str):
+    """
+    Like response.iter_content(), but yields whatever has arrived instead of
+    waiting for full chunks and checks the deadline between reads, so a
+    body that trickles in byte by byte cannot outlive it.
+    """
+    raw = response.raw
+    if not hasattr(raw, 'read1'):
+        # Older urllib3 releases have no read1(); fall back to whole chunks
+        for chunk in response.iter_content(chunk_size):
+            deadline.check(what)
+            yield chunk
+        return
+    while True:
+        deadline.check(what)
+        # Same exception translation as requests' iter_content()
+        try:
+            chunk = raw.read1(chunk_size, decode_content=True)
+        except ReadTimeoutError as e:
+            raise requests.ConnectionError(e)
+        except ProtocolError as e:
+            raise requests.exceptions.ChunkedEncodingError(e)
+        except DecodeError as e:
+            raise requests.exceptions.ContentDecodingError(e)
+        if not chunk:
+            return
+        yield chunk
+
+
+class FeedFetcher:
+    """
+    HTTP transport for feeds: a pooled session with keep-alive per host,
+    compressed transfers, conditional requests (ETag / Last-Modified) and a
+    hard cap on the decoded body size so a runaway response cannot exhaust
+    memory. feedparser only ever sees the downloaded bytes. Timeouts are
+    those of `endpoint_class`, bounded by the current deadline.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, endpoint_class: str = 'feed',
+                 pool_connections: int = 32, pool_maxsize: int = 16):
+        self.max_bytes = max_bytes
+        self.endpoint_class = endpoint_class
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'User-Agent': 'rd-rss-client',
+            'Accept': 'application/rss+xml, application/atom+xml, application/xml;q=0.9, */*;q=0.8',
+            'Accept-Encoding': ACCEPT_ENCODING
+        })
+        self.validators: Dict[str, Dict[str, str]] = {}
+        # Validators of fetches whose entries have been persisted; only these are snapshotted
+        self.committed_validators: Dict[str, Dict[str, str]] = {}
+        self.stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _record(self, url: str, status: Optional[int], wire_bytes: int, body_bytes: int,
+                started: float, error: Optional[str] = None):
+        with self._lock:
+            stats = self.stats.setdefault(url, {
+                'fetches': 0, 'not_modified': 0, 'errors': 0, 'wire_bytes': 0, 'body_bytes': 0
+            })
+            stats['fetches'] += 1
+            stats['wire_bytes'] += wire_bytes
+            stats['body_bytes'] += body_bytes
+            if status == 304:
+                stats['not_modified'] += 1
+            if error:
+                stats['errors'] += 1
+            stats['last_status'] = status
+            stats['last_error'] = error
+            stats['last_duration'] = round(time.monotonic() - started, 3)
+            stats['last_fetched_at'] = time.time()
+
+    def fetch(self, url: str, remember: bool = True) -> FetchResult:
+        """
+        Download a feed, raising requests.RequestException on failure. With
+        remember=False (one-off fetches like validating a new feed) the
+        request is unconditional and its ETag/Last-Modified are not kept, so
+        the first real poll still sees the current entries.
+        """
+        started = time.monotonic()
+        headers = {}
+        validators = self.validators.get(url, {}) if remember else {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+
+        status = None
+        wire_bytes = 0
+        body = bytearray()
+        try:
+            timeout = deadline.timeout_for(self.endpoint_class)
+            with self.session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+                status = response.status_code
+                if status == 304:
+                    self._record(url, status, 0, 0, started)
+                    return FetchResult(url, status, headers=dict(response.headers))
+                response.raise_for_status()
+                declared = response.headers.get('Content-Length')
+                if declared and declared.isdigit() and int(declared) > self.max_bytes:
+                    raise FeedTooLarge(f"Feed declares {declared} bytes, limit is {self.max_bytes}")
+                for chunk in iter_body(response, CHUNK_SIZE, url):
+                    body += chunk
+                    if len(body) > self.max_bytes:
+                        raise FeedTooLarge(f"Feed exceeded {self.max_bytes} bytes")
+                wire_bytes = response.raw.tell()
+                if remember:
+                    self.validators[url] = {
+                        'etag': response.headers.get('ETag'),
+                        'last_modified': response.headers.get('Last-Modified')
+                    }
+                result = FetchResult(response.url, status, bytes(body), dict(response.headers))
+        except requests.RequestException as e:
+            self._record(url, status, wire_bytes, len(body), started, error=str(e))
+            raise
+        self._record(url, status, wire_bytes, len(result.content), started)
+        return result
+
+    def restore_validators(self, validators: Dict[str, Dict[str, str]]) -> int:
+        """Reuse validators from before a restart so the first fetches can be conditional; returns how many were taken"""
+        restored = 0
+        for url, entry in validators.items():
+            if url not in self.validators:
+                self.validators[url] = entry
+                restored += 1
+        self.commit_validators()
+        return restored
+
+    def commit_validators(self):
+        """
+        Call once the entries fetched so far are saved. A snapshot must not
+        hold the validators of a feed whose new entries were lost, or after a
+        restart the feed answers 304 and they are never seen again.
+        """
+        self.committed_validators = dict(self.validators)
+
+    @staticmethod
+    def parse(result: FetchResult):
+        """Parse fetched bytes, passing the HTTP headers feedparser uses for encoding and base URLs"""
+        response_headers = {key.lower(): value for key, value in result.headers.items()
+                            if key.lower() in ('content-type', 'content-language')}
+        response_headers['content-location'] = result.url
+        return feedparser.parse(result.content, response_headers=response_headers)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {url: dict(stats) for url, stats in self.stats.items()}
@@ -0,0 +1,91 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+class FeedScheduler:
+    """
+    Decides the order in which a cycle visits feeds: by user priority first,
+    so high-value feeds are fetched every cycle however long the list is;
+    within a priority, feeds left over from a cycle that ran out of time
+    come first, then those with the highest score
+
+        hours since last fetch + yield * yield_weight
+
+    where yield is an exponentially weighted average of new magnets per
+    fetch. A feed is only started if the time left in the cycle covers its
+    usual fetch duration, so the budget is not spent on fetches that would
+    be cut off.
+    """
+
+    def __init__(self, state_file: str = 'config/feed_schedule.json', yield_weight: float = 2,
+                 alpha: float = 0.3):
+        self.state_file = state_file
+        self.yield_weight = yield_weight
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self.feeds: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(self.state_file):
+            with open(self.state_file, 'r') as f:
+                self.feeds = json.load(f)
+
+    def save(self):
+        with self._lock:
+            with open(self.state_file, 'w') as f:
+                json.dump(self.feeds, f)
+
+    def score(self, feed: str, now: Optional[float] = None) -> float:
+        state = self.feeds.get(feed, {})
+        now = now or time.time()
+        staleness = (now - state.get('last_fetched', 0)) / 3600
+        return staleness + state.get('yield', 0) * self.yield_weight
+
+    def order(self, feeds: Iterable[str], priority_of: Callable[[str], float]) -> List[str]:
+        """Feeds in the order they should be fetched this cycle"""
+        now = time.time()
+
+        def key(feed):
+            deferred = self.feeds.get(feed, {}).get('deferred', False)
+            return -priority_of(feed), not deferred, -self.score(feed, now)
+        return sorted(feeds, key=key)
+
+    def expected_duration(self, feed: str) -> float:
+        return self.feeds.get(feed, {}).get('duration', 0)
+
+    def can_start(self, feed: str, remaining: Optional[float]) -> bool:
+        """Whether `remaining` seconds (None for unlimited) are enough to fetch `feed`"""
+        return remaining is None or (remaining > 0 and remaining >= self.expected_duration(feed))
+
+    def record(self, feed: str, new_items: int, duration: float):
+        with self._lock:
+            state = self.feeds.setdefault(feed, {})
+            if 'yield' in state:
+                state['yield'] = round(self.alpha * new_items + (1 - self.alpha) * state['yield'], 4)
+                state['duration'] = round(self.alpha * duration + (1 - self.alpha) * state['duration'], 3)
+            else:
+                state['yield'] = new_items
+                state['duration'] = round(duration, 3)
+            state['last_fetched'] = time.time()
+            state['deferred'] = False
+
+    def defer(self, feeds: Iterable[str]):
+        """Put feeds the cycle did not reach at the front of the next one"""
+        with self._lock:
+            for feed in feeds:
+                self.feeds.setdefault(feed, {})['deferred'] = True
+
+    def prune(self, feeds: Iterable[str]):
+        """Forget feeds that are no longer configured"""
+        keep = set(feeds)
+        with self._lock:
+            for feed in [feed for feed in self.feeds if feed not in keep]:
+                del self.feeds[feed]
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            feeds = dict(self.feeds)
+        return [dict(state, feed=feed, score=round(self.score(feed, now), 2))
+                for feed, state in feeds.items()]
@@ -0,0 +1,164 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# Real-Debrid statuses in which a torrent may still reach waiting_files_selection
+WAITING_STATUSES = ('magnet_conversion', 'queued')
+PENDING_TTL = 24 * 3600
+# Size of the torrent list fetched per account and tick (Real-Debrid caps it at 5000)
+LIST_LIMIT = 100
+LIST_LIMIT_MAX = 5000
+
+
+class FileSelectionRules:
+    """
+    Decides which files of a torrent to download. Files must match one of
+    `extensions` (if given), be at least `min_size_mb`, and match none of
+    `exclude_patterns`; of those, only the `largest_n` biggest are kept.
+    """
+
+    def __init__(self, extensions: List[str] = None, min_size_mb: float = 0, largest_n: int = 0,
+                 exclude_patterns: List[str] = None):
+        self.extensions = tuple(f".{ext.lower().lstrip('.')}" for ext in extensions or [])
+        self.min_bytes = int(min_size_mb * 1024 * 1024)
+        self.largest_n = largest_n
+        self.exclude = [re.compile(pattern, re.IGNORECASE) for pattern in exclude_patterns or []]
+
+    @staticmethod
+    def validate(settings: Dict[str, Any]):
+        """Raise ValueError unless `settings` has the types the rules expect (null meaning unset)"""
+        if not isinstance(settings, dict):
+            raise ValueError("rules must be an object")
+        largest_n = settings.get('largest_n')
+        if largest_n is not None and (isinstance(largest_n, bool) or not isinstance(largest_n, int) or largest_n < 0):
+            raise ValueError("largest_n must be an integer >= 0")
+        min_size_mb = settings.get('min_size_mb')
+        if min_size_mb is not None and (isinstance(min_size_mb, bool) or not isinstance(min_size_mb, (int, float))
+                                        or not 0 <= min_size_mb < float('inf')):
+            raise ValueError("min_size_mb must be a number >= 0")
+        for name in ('extensions', 'exclude_patterns'):
+            value = settings.get(name)
+            if value is not None and (not isinstance(value, list) or not all(isinstance(item, str) for item in value)):
+                raise ValueError(f"{name} must be a list of strings")
+
+    @classmethod
+    def from_config(cls, settings: Dict[str, Any]) -> 'FileSelectionRules':
+        cls.validate(settings)
+        return cls(extensions=settings.get('extensions'),
+                   min_size_mb=settings.get('min_size_mb') or 0,
+                   largest_n=settings.get('largest_n') or 0,
+                   exclude_patterns=settings.get('exclude_patterns'))
+
+    @property
+    def select_all(self) -> bool:
+        return not (self.extensions or self.min_bytes or self.largest_n or self.exclude)
+
+    def matches(self, file: Dict[str, Any]) -> bool:
+        path = file.get('path', '')
+        if self.extensions and not path.lower().endswith(self.extensions):
+            return False
+        if file.get('bytes', 0) < self.min_bytes:
+            return False
+        return not any(pattern.search(path) for pattern in self.exclude)
+
+    def choose(self, files: List[Dict[str, Any]]) -> Optional[List[int]]:
+        """File ids to select, or None to select everything"""
+        if self.select_all or not files:
+            return None
+        chosen = sorted((file for file in files if self.matches(file)),
+                        key=lambda file: file.get('bytes', 0), reverse=True)
+        if self.largest_n:
+            chosen = chosen[:self.largest_n]
+        if not chosen:
+            # Nothing matched; take the largest file rather than leaving the torrent stuck
+            chosen = [max(files, key=lambda file: file.get('bytes', 0))]
+        return sorted(file['id'] for file in chosen)
+
+
+class FileSelector:
+    """
+    Tracks torrents added to Real-Debrid until their file list is known and
+    selects files for all of them in one batched pass per tick.
+    """
+
+    def __init__(self, state_file: str = 'config/selection.json'):
+        self.state_file = state_file
+        self._lock = threading.RLock()
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(self.state_file):
+            with open(self.state_file, 'r') as f:
+                self.pending = json.load(f)
+
+    def save(self):
+        with self._lock:
+            with open(self.state_file, 'w') as f:
+                json.dump(self.pending, f)
+
+    def track(self, torrent_id: str, account: str):
+        """Remember a newly added torrent; call save() once the batch of additions is done"""
+        with self._lock:
+            self.pending[torrent_id] = {'account': account, 'added_at': time.time()}
+
+    def _process_account(self, account, torrent_ids: List[str], rules: FileSelectionRules) -> List[str]:
+        """
+        Handle one account's pending torrents, returning the ids that are
+        finished with. Statuses come from a single torrent list call; the
+        per-torrent info (for the file list) is only fetched for torrents
+        that are actually waiting for a selection.
+        """
+        limit = min(LIST_LIMIT_MAX, max(LIST_LIMIT, 2 * len(torrent_ids)))
+        torrents = account.api.get_torrents_list(limit=limit)
+        if torrents is None:
+            return []
+        statuses = {torrent.get('id'): torrent.get('status') for torrent in torrents}
+        # A short list is complete, so a pending torrent missing from it was deleted
+        complete = len(torrents) < limit
+        done = []
+        for torrent_id in torrent_ids:
+            status = statuses.get(torrent_id)
+            if status is None:
+                if complete:
+                    done.append(torrent_id)
+                continue
+            if status == 'waiting_files_selection':
+                info = account.api.get_torrent_info(torrent_id)
+                if info is None:
+                    continue
+                file_ids = rules.choose(info.get('files', []))
+                if account.api.select_files(torrent_id, file_ids):
+                    logging.info(f"Selected {len(file_ids) if file_ids else 'all'} files of torrent {torrent_id}")
+                    done.append(torrent_id)
+            elif status not in WAITING_STATUSES:
+                # Already selected elsewhere, downloading, or failed: nothing left to do
+                done.append(torrent_id)
+        return done
+
+    def process(self, pool, rules: FileSelectionRules) -> int:
+        """
+        Run one selection pass over every pending torrent, grouped by account.
+        The lock is released during the Real-Debrid calls so track() (called
+        while draining the admission queue) does not wait for them.
+        """
+        with self._lock:
+            if not self.pending:
+                return 0
+            now = time.time()
+            by_account: Dict[str, List[str]] = {}
+            for torrent_id, entry in list(self.pending.items()):
+                if now - entry['added_at'] > PENDING_TTL or pool.get(entry['account']) is None:
+                    del self.pending[torrent_id]
+                    continue
+                by_account.setdefault(entry['account'], []).append(torrent_id)
+        accounts = [pool.get(name) for name in by_account]
+        results = pool.map(lambda account: self._process_account(account, by_account[account.name], rules),
+                           accounts, background=True) if accounts else {}
+        finished = [torrent_id for done in results.values() for torrent_id in done or []]
+        with self._lock:
+            for torrent_id in finished:
+                self.pending.pop(torrent_id, None)
+            self.save()
+        return len(finished)
@@ -0,0 +1,48 @@
+import bisect
+import hashlib
+from typing import Iterable, List, Optional
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode('utf-8')).digest()[:8], 'big')
+
+
+class HashRing:
+    """Consistent hash ring with virtual nodes"""
+
+    def __init__(self, nodes: Iterable[str] = (), replicas: int = 64):
+        self.replicas = replicas
+        self._keys: List[int] = []
+        self._nodes: List[str] = []
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node: str):
+        for i in range(self.replicas):
+            key = _hash(f"{node}#{i}")
+            index = bisect.bisect(self._keys, key)
+            self._keys.insert(index, key)
+            self._nodes.insert(index, node)
+
+    def remove(self, node: str):
+        pairs = [(k, n) for k, n in zip(self._keys, self._nodes) if n != node]
+        self._keys = [k for k, _ in pairs]
+        self._nodes = [n for _, n in pairs]
+
+    def get(self, key: str) -> Optional[str]:
+        if not self._keys:
+            return None
+        index = bisect.bisect(self._keys, _hash(key)) % len(self._keys)
+        return self._nodes[index]
+
+    def walk(self, key: str) -> List[str]:
+        """All distinct nodes in ring order starting from the owner of `key`"""
+        if not self._keys:
+            return []
+        start = bisect.bisect(self._keys, _hash(key))
+        seen = []
+        for offset in range(len(self._keys)):
+            node = self._nodes[(start + offset) % len(self._keys)]
+            if node not in seen:
+                seen.append(node)
+        return seen
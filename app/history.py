@@ -0,0 +1,224 @@
+import base64
+import bisect
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from magnet import parse_magnet
+
+SORT_FIELDS = ('added_at', 'name', 'feed', 'account')
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class InvalidCursor(ValueError):
+    """A cursor that is malformed or was issued for another sort field or order"""
+
+
+def encode_cursor(key: Any, row_id: int, sort: str = '', descending: bool = False) -> str:
+    data = [key, row_id, sort, 'desc' if descending else 'asc']
+    return base64.urlsafe_b64encode(json.dumps(data).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str, sort: str = '', descending: bool = False) -> Tuple[Any, int]:
+    """The (key, id) position in `cursor`; raises InvalidCursor unless it was issued for `sort` and this order"""
+    try:
+        key, row_id, cursor_sort, cursor_order = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        row_id = int(row_id)
+    except (ValueError, TypeError):
+        raise InvalidCursor('Malformed cursor')
+    if cursor_sort != sort or cursor_order != ('desc' if descending else 'asc'):
+        raise InvalidCursor(f"Cursor was issued for sort={cursor_sort}&order={cursor_order}")
+    return key, row_id
+
+
+def keyset_page(entries: List[Tuple[Any, int]], cursor: Optional[str], limit: int,
+                descending: bool = False, sort: str = '') -> Tuple[List[int], Optional[str]]:
+    """
+    Return one page of row ids from `entries`, a list of (sort key, row id)
+    sorted ascending, continuing after `cursor`. The cursor encodes the last
+    (key, id) seen, so pages stay stable while rows are appended, along with
+    the sort field and order, since a key of one sort cannot be compared
+    with those of another.
+    """
+    position = decode_cursor(cursor, sort, descending) if cursor else None
+    if descending:
+        end = len(entries) if position is None else bisect.bisect_left(entries, tuple(position))
+        start = max(0, end - limit)
+        page = entries[start:end][::-1]
+        has_more = start > 0
+    else:
+        start = 0 if position is None else bisect.bisect_right(entries, tuple(position))
+        page = entries[start:start + limit]
+        has_more = start + limit < len(entries)
+    next_cursor = encode_cursor(*page[-1], sort, descending) if page and has_more else None
+    return [row_id for _, row_id in page], next_cursor
+
+
+def magnet_name(magnet: str) -> str:
+    """Display name from a magnet's dn parameter, falling back to the link itself"""
+    parsed = parse_magnet(magnet)
+    return parsed.name if parsed and parsed.name else magnet
+
+
+class TorrentHistory:
+    """
+    Processed torrents (config/torrents.json) with the indexes the dashboard
+    needs: a magnet and info hash set for deduplication, one sorted (key, id) list per sort
+    field for cursor pagination, and an inverted token index for search.
+    Row ids are positions in the append-only history.
+
+    The file is only read on first use. When a warm-start snapshot restores
+    the deduplication sets, feed cycles can run without reading it at all.
+    """
+
+    def __init__(self, history_file: str = 'config/torrents.json'):
+        self.history_file = history_file
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._dedup_restored = False
+        self.magnets = set()
+        self.infohashes = set()
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+    def load(self):
+        with self._lock:
+            self._loaded = True
+            self.records: List[Dict[str, Any]] = []
+            # Info hashes of parsable magnets, and the links that could not be parsed
+            self.magnets = set()
+            self.infohashes = set()
+            self._sorted: Dict[str, List[Tuple[Any, int]]] = {field: [] for field in SORT_FIELDS}
+            self._tokens: Dict[str, set] = {}
+            self._token_list: List[str] = []
+            if os.path.exists(self.history_file):
+                with open(self.history_file, 'r') as f:
+                    records = json.load(f)
+                # Older versions stored bare magnet links
+                self._index([{'magnet': record} if isinstance(record, str) else record for record in records])
+
+    def save(self):
+        with self._lock:
+            self._ensure_loaded()
+            with open(self.history_file, 'w') as f:
+                json.dump(self.records, f)
+
+    @staticmethod
+    def _sort_key(record: Dict[str, Any], field: str) -> Any:
+        if field == 'added_at':
+            return record.get('added_at') or 0
+        if field == 'name':
+            return record['name'].lower()
+        return record.get(field) or ''
+
+    def _index(self, records: List[Dict[str, Any]]):
+        # Bulk loads sort once at the end instead of inserting in order
+        bulk = len(records) > 1
+        new_tokens = False
+        for record in records:
+            row_id = len(self.records)
+            record.setdefault('name', magnet_name(record['magnet']))
+            self.records.append(record)
+            parsed = parse_magnet(record['magnet'])
+            if parsed is not None:
+                self.infohashes.add(parsed.key)
+            else:
+                self.magnets.add(record['magnet'])
+            for field in SORT_FIELDS:
+                entry = (self._sort_key(record, field), row_id)
+                if bulk:
+                    self._sorted[field].append(entry)
+                else:
+                    bisect.insort(self._sorted[field], entry)
+            for token in set(tokenize(record['name']) + tokenize(record.get('feed') or '')):
+                postings = self._tokens.get(token)
+                if postings is None:
+                    postings = self._tokens[token] = set()
+                    new_tokens = True
+                postings.add(row_id)
+        if bulk:
+            for entries in self._sorted.values():
+                entries.sort()
+        if new_tokens:
+            self._token_list = sorted(self._tokens)
+
+    def __contains__(self, magnet_or_key: str) -> bool:
+        """Accepts a magnet link or a Magnet.key"""
+        if magnet_or_key.startswith('magnet:'):
+            parsed = parse_magnet(magnet_or_key)
+            if parsed is not None:
+                magnet_or_key = parsed.key
+        with self._lock:
+            if not self._dedup_restored:
+                self._ensure_loaded()
+            return magnet_or_key in self.infohashes or magnet_or_key in self.magnets
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self.records)
+
+    def add(self, record: Dict[str, Any]):
+        with self._lock:
+            self._ensure_loaded()
+            self._index([record])
+
+    def file_stamp(self) -> Optional[List[int]]:
+        try:
+            stat = os.stat(self.history_file)
+        except FileNotFoundError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def dedup_state(self) -> Optional[Dict[str, Any]]:
+        """Deduplication sets for a warm-start snapshot, tied to the current file contents"""
+        with self._lock:
+            if not self._loaded and not self._dedup_restored:
+                return None
+            return {'stamp': self.file_stamp(), 'infohashes': list(self.infohashes), 'magnets': list(self.magnets)}
+
+    def restore_dedup(self, state: Dict[str, Any]) -> bool:
+        """Use snapshotted deduplication sets if they match the file on disk, deferring the full load"""
+        with self._lock:
+            stamp = self.file_stamp()
+            if self._loaded or stamp is None or state.get('stamp') != stamp:
+                return False
+            self.infohashes = set(state['infohashes'])
+            self.magnets = set(state['magnets'])
+            self._dedup_restored = True
+            return True
+
+    def _search(self, query: str) -> Optional[set]:
+        """Row ids matching every query token, treating each token as a prefix"""
+        matches = None
+        for token in tokenize(query):
+            rows = set()
+            index = bisect.bisect_left(self._token_list, token)
+            while index < len(self._token_list) and self._token_list[index].startswith(token):
+                rows |= self._tokens[self._token_list[index]]
+                index += 1
+            matches = rows if matches is None else matches & rows
+            if not matches:
+                return set()
+        return matches
+
+    def page(self, sort: str = 'added_at', order: str = 'desc', query: str = '',
+             cursor: Optional[str] = None, limit: int = 50) -> Dict[str, Any]:
+        if sort not in SORT_FIELDS:
+            sort = 'added_at'
+        with self._lock:
+            self._ensure_loaded()
+            entries = self._sorted[sort]
+            matches = self._search(query) if query else None
+            if matches is not None:
+                entries = sorted((self._sort_key(self.records[row_id], sort), row_id) for row_id in matches)
+            row_ids, next_cursor = keyset_page(entries, cursor, limit, descending=order == 'desc', sort=sort)
+            items = [dict(self.records[row_id], id=row_id) for row_id in row_ids]
+            return {'items': items, 'next_cursor': next_cursor, 'total': len(entries)}
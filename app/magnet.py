@@ -0,0 +1,149 @@
+import base64
+import binascii
+from functools import lru_cache
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import unquote, unquote_plus
+
+MAGNET_PREFIX = 'magnet:?'
+BTIH_PREFIX = 'urn:btih:'
+BTMH_PREFIX = 'urn:btmh:'
+# sha2-256 multihash header: function code 0x12, digest length 0x20
+SHA256_MULTIHASH = '1220'
+
+
+class Magnet(NamedTuple):
+    """
+    Normalized magnet link. `infohash` is the lowercase hex v1 (SHA-1) info
+    hash and `btmh` the lowercase hex v2 multihash; hybrid torrents carry both.
+    """
+    uri: str
+    infohash: Optional[str]
+    btmh: Optional[str]
+    name: Optional[str]
+    size: Optional[int]
+    trackers: Tuple[str, ...]
+
+    @property
+    def key(self) -> str:
+        """Identity of the torrent regardless of trackers or display name"""
+        return self.infohash or self.btmh
+
+
+def normalize_btih(value: str) -> Optional[str]:
+    """Lowercase hex form of a v1 info hash given as 40 hex or 32 base32 characters"""
+    if len(value) == 40:
+        try:
+            bytes.fromhex(value)
+        except ValueError:
+            return None
+        return value.lower()
+    if len(value) == 32:
+        try:
+            return base64.b32decode(value.upper()).hex()
+        except (binascii.Error, ValueError):
+            return None
+    return None
+
+
+def normalize_btmh(value: str) -> Optional[str]:
+    value = value.lower()
+    if len(value) != 68 or not value.startswith(SHA256_MULTIHASH):
+        return None
+    try:
+        bytes.fromhex(value)
+    except ValueError:
+        return None
+    return value
+
+
+def _decode(value: str, plus: bool = True) -> str:
+    # Most parameters are plain ASCII; skip the unquote call for those
+    if '%' not in value and not (plus and '+' in value):
+        return value
+    return unquote_plus(value) if plus else unquote(value)
+
+
+def _parse_magnet(uri: str) -> Optional[Magnet]:
+    if uri[:8].lower() != MAGNET_PREFIX:
+        return None
+    infohash = btmh = name = size = None
+    trackers = []
+    for param in uri[8:].split('&'):
+        key, _, value = param.partition('=')
+        # Multiple exact topics may be numbered: xt.1, xt.2, ...
+        key = key.split('.', 1)[0].lower()
+        if key == 'xt':
+            value = _decode(value)
+            topic = value[:9].lower()
+            if topic == BTIH_PREFIX and infohash is None:
+                infohash = normalize_btih(value[9:])
+            elif topic == BTMH_PREFIX and btmh is None:
+                btmh = normalize_btmh(value[9:])
+        elif key == 'dn' and name is None:
+            name = _decode(value)
+        elif key == 'xl' and size is None:
+            size = int(value) if value.isdigit() else None
+        elif key == 'tr':
+            tracker = _decode(value, plus=False)
+            if tracker and tracker not in trackers:
+                trackers.append(tracker)
+    if infohash is None and btmh is None:
+        return None
+    return Magnet(uri, infohash, btmh, name, size, tuple(trackers))
+
+
+# Feeds repeat most of their entries every cycle, so parsed links are kept
+parse_magnet = lru_cache(maxsize=8192)(_parse_magnet)
+parse_magnet.__doc__ = "Parse a magnet URI into a Magnet, or None if it has no BitTorrent info hash"
+
+
+def parse_magnets(links: Iterable[str]) -> List[Magnet]:
+    """
+    Parse a batch of links in one pass, skipping anything that is not a
+    BitTorrent magnet and keeping only the first link for each torrent.
+    """
+    seen = set()
+    magnets = []
+    for link in links:
+        if not link:
+            continue
+        magnet = parse_magnet(link)
+        if magnet is None or magnet.key in seen:
+            continue
+        seen.add(magnet.key)
+        magnets.append(magnet)
+    return magnets
+
+
+def _benchmark(count: int = 5000, repeat: int = 5):
+    """Compare the parser with urllib's parse_qs on synthetic feed entries"""
+    import timeit
+    from urllib.parse import parse_qs, urlsplit
+
+    links = [
+        f"magnet:?xt=urn:btih:{i:040x}&dn=Some.Show.S01E{i % 100:02d}.1080p.WEB.x264"
+        f"&xl={i * 1024}&tr=udp%3A%2F%2Ftracker.example.org%3A1337%2Fannounce"
+        f"&tr=http%3A%2F%2Ftracker.example.net%2Fannounce"
+        for i in range(count)
+    ]
+
+    def with_parse_qs():
+        for link in links:
+            params = parse_qs(urlsplit(link).query)
+            params['xt'][0].split('btih:')[1].lower()
+
+    def uncached():
+        for link in links:
+            _parse_magnet(link)
+
+    def cached():
+        parse_magnets(links)
+
+    parse_magnets(links)
+    for label, func in (('parse_qs', with_parse_qs), ('parse_magnet', uncached), ('parse_magnets, cached', cached)):
+        best = min(timeit.repeat(func, number=1, repeat=repeat))
+        print(f"{label:>22}: {best * 1e6 / count:7.2f} us/link")
+
+
+if __name__ == '__main__':
+    _benchmark()
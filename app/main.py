@@ -1,21 +1,34 @@
 import logging
-from flask import Flask, render_template, request, redirect, url_for, jsonify, flash
+from flask import Flask, Response, g, render_template, request, redirect, url_for, jsonify, flash
 from flask_login import LoginManager, login_required, login_user, logout_user, current_user
 from apscheduler.schedulers.background import BackgroundScheduler
 import os
-import feedparser
-import json
-import time
+import requests
+import re
+from concurrent.futures import ThreadPoolExecutor
+import xml.etree.ElementTree as ET
 from auth import User, init_auth, check_password, update_password
-from config import Config
-from rd_api import RealDebridAPI
+from rd_api import rd_metadata
+from accounts import account_name
+import metrics
+import deadline
+from assets import AssetPipeline
+from history import InvalidCursor, keyset_page
+from opml import build_opml, normalize_feed_url, parse_feed_list
+from file_selection import FileSelectionRules
+from downloader import DownloadManager
+import pipeline
+from pipeline import (config, admission_queue, history, feed_fetcher, websub, file_selector,
+                      feed_breakers, get_account_pool, check_feeds, drain_queue, process_entries,
+                      schedule_jobs, init_cluster, init_warm_start)
+import feedparser
 
 # Initialize Flask app and configure it
 app = Flask(__name__)
 app.static_folder = 'static'
 app.template_folder = 'templates'
 app.secret_key = os.urandom(24)
-app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0  # Disable caching during development
+assets = AssetPipeline(app)  # Fingerprinted static files, see asset_url() in templates
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)  # Enable debug logging
@@ -26,13 +39,58 @@ login_manager.init_app(app)
 login_manager.login_view = 'login'
 
 # Initialize other components
-config = Config()
 scheduler = BackgroundScheduler()
+REQUEST_DEADLINE = 30  # seconds, overridable with the 'request_deadline' setting
+download_manager = DownloadManager(config.get_download_dir(), max_rate=config.get_download_max_rate() or None)
+
+def request_accounts(pool):
+    """Accounts targeted by the current request: the one named by ?account= or all of them"""
+    name = request.args.get('account')
+    if name:
+        account = pool.get(name)
+        return [account] if account else []
+    return list(pool.accounts.values())
+
+def aggregate(results):
+    """Pass a single account's result through; key several by account name"""
+    if len(results) == 1:
+        return next(iter(results.values()))
+    return results
+
+def aggregate_list(results):
+    """Concatenate per-account lists, tagging each item with its account"""
+    items = []
+    for name, result in results.items():
+        for item in result or []:
+            items.append(dict(item, account=name))
+    return items
+
+def aggregate_success(results, message):
+    failed = [name for name, success in results.items() if not success]
+    if results and not failed:
+        return {"status": "success"}
+    return {"status": "error", "message": message, "accounts": failed}
+
+def first_result(results):
+    return next((result for result in results.values() if result is not None), None)
 
 @login_manager.user_loader
 def load_user(user_id):
     return User.get(user_id)
 
+@app.before_request
+def start_request_deadline():
+    # API calls fan out to Real-Debrid and feeds; bound how long a worker can be tied up
+    if request.path.startswith('/api/'):
+        pipeline.timeouts.get()
+        g.deadline_token = deadline.set_deadline(config.snapshot().get('request_deadline', REQUEST_DEADLINE))
+
+@app.teardown_request
+def end_request_deadline(exc):
+    token = g.pop('deadline_token', None)
+    if token is not None:
+        deadline.reset(token)
+
 @app.route('/login', methods=['GET', 'POST'])
 def login():
     if current_user.is_authenticated:
@@ -64,8 +122,51 @@ def change_password():
 @login_required
 def index():
     return render_template('index.html', 
-                         feeds=config.get_feeds(),
-                         rd_api_key=config.get_rd_api_key())
+                         accounts=get_account_pool().to_dict(),
+                         public_url=config.get_public_url(),
+                         breakers=get_account_pool().breakers_snapshot() + feed_breakers.snapshot())
+
+def page_args(default_order='desc'):
+    """Common query parameters of the paginated list endpoints"""
+    order = request.args.get('order', default_order)
+    return {
+        'sort': request.args.get('sort', ''),
+        'order': order if order in ('asc', 'desc') else default_order,
+        'query': request.args.get('q', '').strip(),
+        'cursor': request.args.get('cursor'),
+        'limit': max(1, min(request.args.get('limit', 50, type=int), 500))
+    }
+
+@app.route('/api/torrents', methods=['GET'])
+@login_required
+def list_torrents():
+    args = page_args()
+    return jsonify(history.page(sort=args['sort'] or 'added_at', order=args['order'], query=args['query'],
+                                cursor=args['cursor'], limit=args['limit']))
+
+@app.route('/api/feeds', methods=['GET'])
+@login_required
+def list_feeds():
+    args = page_args(default_order='asc')
+    sort = args['sort'] if args['sort'] in ('url', 'priority') else 'position'
+    query = args['query'].lower()
+    snapshot = config.snapshot()
+    entries = []
+    for feed_id, url in enumerate(snapshot.feeds):
+        if query and query not in url.lower():
+            continue
+        key = {'url': url.lower(), 'priority': snapshot.feed_priority(url), 'position': feed_id}[sort]
+        entries.append((key, feed_id))
+    entries.sort()
+    feed_ids, next_cursor = keyset_page(entries, args['cursor'], args['limit'],
+                                        descending=args['order'] == 'desc', sort=sort)
+    items = [{'id': feed_id, 'url': snapshot.feeds[feed_id], 'priority': snapshot.feed_priority(snapshot.feeds[feed_id])}
+             for feed_id in feed_ids]
+    return jsonify({'items': items, 'next_cursor': next_cursor, 'total': len(entries)})
+
+@app.errorhandler(InvalidCursor)
+def invalid_cursor(e):
+    return jsonify({"status": "error", "message": str(e)}), 400
 
 @app.route('/api/feeds', methods=['POST'])
 @login_required
@@ -74,45 +175,220 @@ def add_feed():
     config.add_feed(feed_url)
     return jsonify({"status": "success"})
 
+def validate_feed(url):
+    """
+    Fetch and parse a feed once, returning an error message or None if it
+    is usable. Raises DeadlineExceeded when the request ran out of time
+    first, which says nothing about the feed.
+    """
+    try:
+        parsed_feed = feed_fetcher.parse(feed_fetcher.fetch(url, remember=False))
+    except deadline.DeadlineExceeded:
+        raise
+    except requests.RequestException as e:
+        if deadline.expired():
+            # The read timeout was clamped to what was left of the deadline
+            raise deadline.DeadlineExceeded(str(e))
+        return str(e)
+    if parsed_feed.bozo and not parsed_feed.entries:
+        return f"Not a valid feed: {parsed_feed.get('bozo_exception')}"
+    return None
+
+@app.route('/api/feeds/import', methods=['POST'])
+@login_required
+def import_feeds():
+    upload = request.files.get('file')
+    data = upload.read() if upload else request.get_data()
+    try:
+        urls = parse_feed_list(data)
+    except ET.ParseError as e:
+        return jsonify({"status": "error", "message": f"Invalid OPML: {str(e)}"})
+
+    candidates = list(dict.fromkeys(normalize_feed_url(url) for url in urls))
+    new_feeds = [url for url in candidates if not config.has_feed(url)]
+    invalid = []
+    unvalidated = []
+    if new_feeds and request.args.get('validate', '1') != '0':
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            futures = {url: deadline.submit(executor, validate_feed, url) for url in new_feeds}
+            for url, future in futures.items():
+                try:
+                    error = future.result()
+                except deadline.DeadlineExceeded:
+                    # Not checked in time: import it anyway, its first poll will tell
+                    unvalidated.append(url)
+                    continue
+                if error:
+                    invalid.append({'url': url, 'error': error})
+        rejected = {entry['url'] for entry in invalid}
+        new_feeds = [url for url in new_feeds if url not in rejected]
+    added = config.add_feeds(new_feeds)
+    return jsonify({
+        "status": "success",
+        "added": added,
+        "duplicates": len(urls) - len(added) - len(invalid),
+        "invalid": invalid,
+        "unvalidated": unvalidated
+    })
+
+@app.route('/api/feeds/export', methods=['GET'])
+@login_required
+def export_feeds():
+    feeds = config.get_feeds()
+    if request.args.get('format') == 'txt':
+        return Response('\n'.join(feeds) + '\n', mimetype='text/plain',
+                        headers={'Content-Disposition': 'attachment; filename=feeds.txt'})
+    return Response(build_opml(feeds), mimetype='text/x-opml',
+                    headers={'Content-Disposition': 'attachment; filename=feeds.opml'})
+
 @app.route('/api/feeds/<int:feed_id>', methods=['DELETE'])
 @login_required
 def remove_feed(feed_id):
+    snapshot = config.snapshot()
+    feeds = snapshot.feeds
+    if 0 <= feed_id < len(feeds):
+        websub.unsubscribe(feeds[feed_id], snapshot.get('public_url'))
     config.remove_feed(feed_id)
     return jsonify({"status": "success"})
 
+@app.route('/api/feeds/<int:feed_id>/priority', methods=['POST'])
+@login_required
+def set_feed_priority(feed_id):
+    feeds = config.get_feeds()
+    if not 0 <= feed_id < len(feeds):
+        return jsonify({"status": "error", "message": "Unknown feed"})
+    config.set_feed_priority(feeds[feed_id], int(request.json.get('priority', 0)))
+    return jsonify({"status": "success"})
+
+@app.route('/api/queue', methods=['GET'])
+@login_required
+def get_queue():
+    return jsonify({
+        'accounts': get_account_pool().to_dict(),
+        'items': admission_queue.items(),
+        'failed': list(admission_queue.failed)
+    })
+
 @app.route('/api/settings', methods=['POST'])
 @login_required
 def update_settings():
-    rd_api_key = request.json.get('rd_api_key')
-    config.set_rd_api_key(rd_api_key)
+    if 'rd_api_keys' in request.json:
+        config.set_rd_api_keys(request.json.get('rd_api_keys') or [])
+    elif 'add_rd_api_keys' in request.json or 'remove_rd_accounts' in request.json:
+        # Keys are write-only: the page only knows account names, so it sends changes, not the list
+        remove = set(request.json.get('remove_rd_accounts') or [])
+        keys = [key for key in config.get_rd_api_keys() if account_name(key) not in remove]
+        config.set_rd_api_keys(keys + list(request.json.get('add_rd_api_keys') or []))
+    elif 'rd_api_key' in request.json:
+        config.set_rd_api_key(request.json.get('rd_api_key'))
+    if 'public_url' in request.json:
+        config.set_public_url((request.json.get('public_url') or '').strip())
+    return jsonify({"status": "success"})
+
+@app.route('/websub/callback/<sub_id>', methods=['GET'])
+def websub_verify(sub_id):
+    challenge = websub.verify_intent(sub_id, request.args)
+    if challenge is None:
+        return Response('Unknown subscription', status=404)
+    return Response(challenge, mimetype='text/plain')
+
+@app.route('/websub/callback/<sub_id>', methods=['POST'])
+def websub_push(sub_id):
+    # Anyone can reach this route, so the body is capped like a polled feed and nothing here waits on a lock
+    max_bytes = feed_fetcher.max_bytes
+    if request.content_length is not None and request.content_length > max_bytes:
+        metrics.inc('websub.too_large')
+        return Response(status=413)
+    body = request.stream.read(max_bytes + 1)
+    if len(body) > max_bytes:
+        metrics.inc('websub.too_large')
+        return Response(status=413)
+    feed = websub.verify_content(sub_id, body, request.headers.get('X-Hub-Signature'))
+    # Hubs expect a 2xx even for content we ignore, so unauthenticated pushes are acknowledged and dropped
+    if feed is None:
+        metrics.inc('websub.rejected')
+        return Response(status=202)
+    parsed_feed = feedparser.parse(body, response_headers={
+        'content-type': request.headers.get('Content-Type', 'application/xml'),
+        'content-location': feed
+    })
+    metrics.inc('websub.pushes')
+    if process_entries(feed, parsed_feed.entries):
+        admission_queue.save()
+        # Admit them from a scheduler thread; bursts of pushes share one pending job
+        scheduler.add_job(drain_queue, id='websub_drain', replace_existing=True)
+    return Response(status=202)
+
+@app.route('/api/file_selection', methods=['GET'])
+@login_required
+def get_file_selection():
+    return jsonify({
+        'rules': config.get_file_selection(),
+        'pending': file_selector.pending
+    })
+
+@app.route('/api/file_selection', methods=['POST'])
+@login_required
+def update_file_selection():
+    rules = request.json or {}
+    try:
+        FileSelectionRules.from_config(rules)
+    except (re.error, TypeError, ValueError) as e:
+        return jsonify({"status": "error", "message": f"Invalid rules: {str(e)}"})
+    config.set_file_selection(rules)
     return jsonify({"status": "success"})
 
 @app.route('/api/refresh', methods=['POST'])
 @login_required
 def refresh_feeds():
+    # A cycle can take far longer than a request may (and waits for any running one),
+    # so it runs as a one-off scheduler job; repeated clicks share the pending job
     try:
-        check_feeds()
-        return jsonify({"status": "success"})
+        scheduler.add_job(check_feeds, id='manual_refresh', replace_existing=True)
+        return jsonify({"status": "success", "message": "Feed check started"})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
 
+@app.route('/api/metrics', methods=['GET'])
+@login_required
+def get_metrics():
+    return jsonify({
+        'counters': metrics.snapshot(),
+        'breakers': {
+            'real_debrid': get_account_pool().breakers_snapshot(),
+            'feeds': feed_breakers.snapshot()
+        },
+        'websub': websub.snapshot(),
+        'feed_transfers': feed_fetcher.snapshot(),
+        'feed_schedule': pipeline.feed_schedule.snapshot(),
+        'cluster': pipeline.cluster.snapshot() if pipeline.cluster else None
+    })
+
+@app.route('/api/accounts', methods=['GET'])
+@login_required
+def get_accounts():
+    return jsonify(get_account_pool().to_dict())
+
 @app.route('/api/user', methods=['GET'])
 @login_required
 def get_user_info():
-    rd_api = RealDebridAPI(config.get_rd_api_key())
+    pool = get_account_pool()
     try:
-        user_info = rd_api.get_user_info()
-        return jsonify(user_info)
+        results = pool.map(lambda account: account.api.get_user_info(), request_accounts(pool))
+        return jsonify(aggregate(results))
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
 
 @app.route('/api/unrestrict', methods=['POST'])
 @login_required
 def unrestrict_link():
-    rd_api = RealDebridAPI(config.get_rd_api_key())
+    pool = get_account_pool()
     link = request.json.get('link')
+    accounts = request_accounts(pool)
+    if not accounts:
+        return jsonify({"status": "error", "message": "No Real-Debrid account configured"})
     try:
-        unrestricted_link = rd_api.unrestrict_link(link)
+        unrestricted_link = accounts[0].api.unrestrict_link(link)
         return jsonify(unrestricted_link)
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
@@ -120,40 +396,41 @@ def unrestrict_link():
 @app.route('/api/traffic', methods=['GET'])
 @login_required
 def get_traffic_info():
-    rd_api = RealDebridAPI(config.get_rd_api_key())
+    pool = get_account_pool()
     try:
-        traffic_info = rd_api.get_traffic_info()
-        return jsonify(traffic_info)
+        results = pool.map(lambda account: account.api.get_traffic_info(), request_accounts(pool))
+        return jsonify(aggregate(results))
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
 
 @app.route('/api/streaming/<file_id>', methods=['GET'])
 @login_required
 def get_streaming_links(file_id):
-    rd_api = RealDebridAPI(config.get_rd_api_key())
+    pool = get_account_pool()
     try:
-        streaming_links = rd_api.get_streaming_links(file_id)
-        return jsonify(streaming_links)
+        results = pool.map(lambda account: account.api.get_streaming_links(file_id), request_accounts(pool))
+        return jsonify(first_result(results))
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
 
 @app.route('/api/downloads', methods=['GET'])
 @login_required
 def get_downloads_list():
-    rd_api = RealDebridAPI(config.get_rd_api_key())
+    pool = get_account_pool()
     try:
-        downloads_list = rd_api.get_downloads_list()
-        return jsonify(downloads_list)
+        results = pool.map(lambda account: account.api.get_downloads_list(), request_accounts(pool))
+        return jsonify(aggregate_list(results))
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
 
 @app.route('/api/downloads/<download_id>', methods=['DELETE'])
 @login_required
 def delete_download(download_id):
-    rd_api = RealDebridAPI(config.get_rd_api_key())
+    pool = get_account_pool()
     try:
-        success = rd_api.delete_download(download_id)
-        if success:
+        # A download id belongs to exactly one account, so any success will do
+        results = pool.map(lambda account: account.api.delete_download(download_id), request_accounts(pool))
+        if any(results.values()):
             return jsonify({"status": "success"})
         else:
             return jsonify({"status": "error", "message": "Failed to delete download"})
@@ -163,9 +440,10 @@ def delete_download(download_id):
 @app.route('/api/hosts', methods=['GET'])
 @login_required
 def get_supported_hosts():
-    rd_api = RealDebridAPI(config.get_rd_api_key())
+    pool = get_account_pool()
+    account = pool.primary()
     try:
-        supported_hosts = rd_api.get_supported_hosts()
+        supported_hosts = rd_metadata.get('hosts', account.api.get_supported_hosts) if account else None
         return jsonify(supported_hosts)
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
@@ -173,73 +451,62 @@ def get_supported_hosts():
 @app.route('/api/settings', methods=['GET'])
 @login_required
 def get_user_settings():
-    rd_api = RealDebridAPI(config.get_rd_api_key())
+    pool = get_account_pool()
     try:
-        user_settings = rd_api.get_user_settings()
-        return jsonify(user_settings)
+        results = pool.map(lambda account: account.api.get_user_settings(), request_accounts(pool))
+        return jsonify(aggregate(results))
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
 
 @app.route('/api/settings', methods=['POST'])
 @login_required
 def update_user_settings():
-    rd_api = RealDebridAPI(config.get_rd_api_key())
+    pool = get_account_pool()
     settings = request.json
     try:
-        success = rd_api.update_user_settings(settings)
-        if success:
-            return jsonify({"status": "success"})
-        else:
-            return jsonify({"status": "error", "message": "Failed to update settings"})
+        results = pool.map(lambda account: account.api.update_user_settings(settings), request_accounts(pool))
+        return jsonify(aggregate_success(results, "Failed to update settings"))
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
 
 @app.route('/api/settings/convert_points', methods=['POST'])
 @login_required
 def convert_fidelity_points():
-    rd_api = RealDebridAPI(config.get_rd_api_key())
+    pool = get_account_pool()
     try:
-        success = rd_api.convert_fidelity_points()
-        if success:
-            return jsonify({"status": "success"})
-        else:
-            return jsonify({"status": "error", "message": "Failed to convert fidelity points"})
+        results = pool.map(lambda account: account.api.convert_fidelity_points(), request_accounts(pool))
+        return jsonify(aggregate_success(results, "Failed to convert fidelity points"))
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
 
 @app.route('/api/settings/upload_avatar', methods=['PUT'])
 @login_required
 def upload_avatar():
-    rd_api = RealDebridAPI(config.get_rd_api_key())
+    pool = get_account_pool()
     avatar_file = request.data
     try:
-        success = rd_api.upload_avatar(avatar_file)
-        if success:
-            return jsonify({"status": "success"})
-        else:
-            return jsonify({"status": "error", "message": "Failed to upload avatar"})
+        results = pool.map(lambda account: account.api.upload_avatar(avatar_file), request_accounts(pool))
+        return jsonify(aggregate_success(results, "Failed to upload avatar"))
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
 
 @app.route('/api/settings/delete_avatar', methods=['DELETE'])
 @login_required
 def delete_avatar():
-    rd_api = RealDebridAPI(config.get_rd_api_key())
+    pool = get_account_pool()
     try:
-        success = rd_api.delete_avatar()
-        if success:
-            return jsonify({"status": "success"})
-        else:
-            return jsonify({"status": "error", "message": "Failed to delete avatar"})
+        results = pool.map(lambda account: account.api.delete_avatar(), request_accounts(pool))
+        return jsonify(aggregate_success(results, "Failed to delete avatar"))
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
 
 @app.route('/api/time', methods=['GET'])
 @login_required
 def get_server_time():
-    rd_api = RealDebridAPI(config.get_rd_api_key())
+    pool = get_account_pool()
+    account = pool.primary()
     try:
-        server_time = rd_api.get_server_time()
+        server_time = account.api.get_server_time() if account else None
         return jsonify(server_time)
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
@@ -247,9 +514,10 @@ def get_server_time():
 @app.route('/api/time/iso', methods=['GET'])
 @login_required
 def get_server_time_iso():
-    rd_api = RealDebridAPI(config.get_rd_api_key())
+    pool = get_account_pool()
+    account = pool.primary()
     try:
-        server_time_iso = rd_api.get_server_time_iso()
+        server_time_iso = account.api.get_server_time_iso() if account else None
         return jsonify(server_time_iso)
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
@@ -257,16 +525,44 @@ def get_server_time_iso():
 @app.route('/api/disable_access_token', methods=['GET'])
 @login_required
 def disable_access_token():
-    rd_api = RealDebridAPI(config.get_rd_api_key())
+    pool = get_account_pool()
     try:
-        success = rd_api.disable_access_token()
-        if success:
-            return jsonify({"status": "success"})
-        else:
-            return jsonify({"status": "error", "message": "Failed to disable access token"})
+        results = pool.map(lambda account: account.api.disable_access_token(), request_accounts(pool))
+        return jsonify(aggregate_success(results, "Failed to disable access token"))
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
 
+@app.route('/api/local_downloads', methods=['GET'])
+@login_required
+def list_local_downloads():
+    return jsonify(download_manager.snapshot())
+
+@app.route('/api/local_downloads', methods=['POST'])
+@login_required
+def start_local_download():
+    """Download a direct URL, or unrestrict a hoster link first, into the local download directory"""
+    url = request.json.get('url')
+    filename = request.json.get('filename')
+    if request.json.get('link'):
+        account = get_account_pool().primary()
+        unrestricted = account.api.unrestrict_link(request.json['link']) if account else None
+        if not unrestricted:
+            return jsonify({"status": "error", "message": "Failed to unrestrict link"})
+        url = unrestricted['download']
+        filename = filename or unrestricted.get('filename')
+    if not url:
+        return jsonify({"status": "error", "message": "A url or link is required"})
+    max_rate = request.json.get('max_rate')
+    if max_rate is not None:
+        try:
+            max_rate = float(max_rate)
+        except (TypeError, ValueError):
+            max_rate = -1
+        if not 0 <= max_rate < float('inf'):
+            return jsonify({"status": "error", "message": "max_rate must be a number of bytes per second"}), 400
+    job = download_manager.add(url, filename, max_rate=max_rate or None)
+    return jsonify({"status": "success", "job": job.to_dict()})
+
 @app.route('/test-static')
 def test_static():
     """Debug endpoint to test static file locations"""
@@ -278,49 +574,10 @@ def test_static():
         'files': files
     })
 
-def load_torrents():
-    if os.path.exists('config/torrents.json'):
-        with open('config/torrents.json', 'r') as f:
-            return json.load(f)
-    return []
-
-def save_torrents(torrents):
-    with open('config/torrents.json', 'w') as f:
-        json.dump(torrents, f)
-
-def start_download(rd_api, torrent_id):
-    rd_api.start_download(torrent_id)
-
-def check_feeds():
-    rd_api = RealDebridAPI(config.get_rd_api_key())
-    added_torrents = load_torrents()
-    for feed in config.get_feeds():
-        parsed_feed = feedparser.parse(feed)
-        for entry in parsed_feed.entries:
-            if 'magnet' in entry.link:
-                magnet_link = entry.link
-                if magnet_link not in added_torrents:
-                    response = rd_api.add_magnet(magnet_link)
-                    if 'id' in response:
-                        torrent_id = response['id']
-                        start_download(rd_api, torrent_id)
-                        added_torrents.append(magnet_link)
-    save_torrents(added_torrents)
-
-def retry_with_exponential_backoff(func, max_retries=5):
-    retries = 0
-    while retries < max_retries:
-        try:
-            return func()
-        except Exception as e:
-            wait_time = 2 ** retries
-            logging.error(f"Error: {e}. Retrying in {wait_time} seconds...")
-            time.sleep(wait_time)
-            retries += 1
-    raise Exception("Max retries exceeded")
-
 if __name__ == '__main__':
     init_auth()
-    scheduler.add_job(check_feeds, 'interval', hours=1)
+    init_warm_start()
+    init_cluster()
+    schedule_jobs(scheduler)
     scheduler.start()
     app.run(host='0.0.0.0', port=10500)
@@ -0,0 +1,21 @@
+import threading
+from collections import defaultdict
+from typing import Dict
+
+_lock = threading.Lock()
+_counters: Dict[str, int] = defaultdict(int)
+
+
+def inc(name: str, amount: int = 1):
+    """Increment a named counter"""
+    with _lock:
+        _counters[name] += amount
+
+
+def get(name: str) -> int:
+    return _counters.get(name, 0)
+
+
+def snapshot() -> Dict[str, int]:
+    with _lock:
+        return dict(_counters)
@@ -0,0 +1,44 @@
+import xml.etree.ElementTree as ET
+from typing import List
+from urllib.parse import urlsplit, urlunsplit
+from xml.sax.saxutils import quoteattr
+
+
+def normalize_feed_url(url: str) -> str:
+    """Canonical form used for deduplication: trimmed, lower-case scheme and host, no fragment"""
+    url = url.strip()
+    parts = urlsplit(url)
+    if not parts.scheme or not parts.netloc:
+        return url
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', parts.query, ''))
+
+
+def parse_opml(data: bytes) -> List[str]:
+    """Feed URLs from every outline with an xmlUrl, including nested categories"""
+    root = ET.fromstring(data)
+    return [outline.get('xmlUrl') for outline in root.iter('outline') if outline.get('xmlUrl')]
+
+
+def parse_plain_list(text: str) -> List[str]:
+    """One URL per line; blank lines and # comments are ignored"""
+    return [line.strip() for line in text.splitlines() if line.strip() and not line.strip().startswith('#')]
+
+
+def parse_feed_list(data: bytes) -> List[str]:
+    """Parse an OPML document or a plain list, whichever `data` looks like"""
+    if data.lstrip().startswith(b'<'):
+        return parse_opml(data)
+    return parse_plain_list(data.decode('utf-8', errors='replace'))
+
+
+def build_opml(feeds: List[str], title: str = 'RSS-Debrid Client feeds') -> str:
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<opml version="2.0">',
+        f'  <head><title>{title}</title></head>',
+        '  <body>'
+    ]
+    for url in feeds:
+        lines.append(f'    <outline type="rss" text={quoteattr(url)} xmlUrl={quoteattr(url)}/>')
+    lines.extend(['  </body>', '</opml>', ''])
+    return '\n'.join(lines)
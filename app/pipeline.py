@@ -0,0 +1,271 @@
+"""
+Feed processing without the web UI: the shared components, one feed cycle
+and the scheduled jobs. Used by the Flask app (main.py) and the headless
+CLI (cli.py), so nothing here may import Flask.
+"""
+import atexit
+import logging
+import threading
+import time
+
+import requests
+
+from accounts import AccountPool
+from admission import AdmissionQueue
+from circuit_breaker import CircuitBreakerRegistry
+from cluster import ClusterMember, ClusterStore
+from config import Config, SnapshotCache
+import deadline
+from feed_fetcher import FeedFetcher
+from feed_scheduler import FeedScheduler
+from file_selection import FileSelectionRules, FileSelector
+from history import TorrentHistory
+from magnet import parse_magnets
+import metrics
+from rd_api import rd_metadata
+from warm_start import WarmStart
+from websub import WebSubManager
+
+config = Config()
+admission_queue = AdmissionQueue()
+history = TorrentHistory()
+feed_fetcher = FeedFetcher()
+feed_schedule = FeedScheduler()
+websub = WebSubManager()
+file_selector = FileSelector()
+# Serializes cycles and queue drains, which both rewrite torrents.json
+cycle_lock = threading.RLock()
+feed_breakers = CircuitBreakerRegistry(failure_rate=0.5, min_calls=2, window=6, reset_timeout=1800)
+warm_start = WarmStart()
+warm_start.register('history', history.dedup_state, history.restore_dedup)
+warm_start.register('feed_validators', lambda: dict(feed_fetcher.committed_validators),
+                    feed_fetcher.restore_validators)
+warm_start.register('rd_metadata', rd_metadata.export, rd_metadata.restore)
+# Set by init_cluster() when several instances share the feeds
+cluster = None
+# Seconds a feed cycle, or a queue drain / file selection run, may take overall
+CYCLE_DEADLINE = 900
+JOB_DEADLINE = 120
+
+def build_account_pool(snapshot, previous):
+    """Rebuild the account pool only when the API keys or placement actually changed"""
+    keys = list(snapshot.rd_api_keys())
+    placement = snapshot.get('account_placement', 'least_loaded')
+    if previous is not None and previous.api_keys == keys and previous.placement == placement:
+        return previous
+    if previous is not None:
+        previous.shutdown()
+    return AccountPool(keys, placement)
+
+account_pool = SnapshotCache(config, build_account_pool)
+file_selection_rules = SnapshotCache(
+    config, lambda snapshot, previous: FileSelectionRules.from_config(snapshot.get('file_selection', {})))
+
+timeouts = SnapshotCache(config, lambda snapshot, previous: deadline.configure(snapshot.get('timeouts') or {}))
+
+def get_account_pool():
+    return account_pool.get()
+
+def job_deadline(setting, default):
+    """Deadline context for a cycle or job, `setting` naming its override in the settings"""
+    timeouts.get()
+    return deadline.deadline(config.snapshot().get(setting, default))
+
+def init_cluster(store_path=None, node_id=None):
+    """
+    Join the cluster configured under 'cluster' in the settings (or given
+    explicitly). Returns the membership, or None when running standalone.
+    """
+    global cluster
+    settings = config.snapshot().get('cluster') or {}
+    store_path = store_path or settings.get('store')
+    if not store_path:
+        return None
+    cluster = ClusterMember(ClusterStore(store_path), node_id or settings.get('node_id'))
+    cluster.heartbeat()
+    atexit.register(cluster.leave)
+    logging.info(f"Joined cluster at {store_path} as {cluster.node_id}; WebSub is disabled, every feed is polled")
+    return cluster
+
+def init_warm_start():
+    """Restore the last snapshot and write a new one on exit"""
+    restored = [name for name, result in warm_start.restore().items() if result]
+    atexit.register(warm_start.save)
+    if restored:
+        logging.info(f"Warm start: restored {', '.join(sorted(restored))}")
+
+def fetch_feed(feed):
+    """
+    Fetch and parse a feed through its circuit breaker. Returns the parsed
+    feed, or None when the feed was skipped, failed, or has not changed
+    since the last fetch, along with whether a fetch was actually completed
+    (False when the circuit was open or the deadline cut it short).
+    """
+    breaker = feed_breakers.get(feed)
+    if not breaker.allow_request():
+        metrics.inc('feeds.short_circuited')
+        logging.info(f"Skipping feed {feed}: circuit {breaker.state}")
+        return None, False
+    try:
+        result = feed_fetcher.fetch(feed)
+    except requests.RequestException as e:
+        if isinstance(e, deadline.DeadlineExceeded) or deadline.expired():
+            # Out of time for this cycle; not the feed's fault
+            breaker.release()
+            metrics.inc('feeds.deadline_exceeded')
+            logging.warning(f"Deadline reached while fetching feed {feed}")
+            return None, False
+        breaker.record_failure()
+        metrics.inc('feeds.failures')
+        logging.error(f"Error fetching feed {feed}: {str(e)}")
+        return None, True
+    if result.not_modified:
+        breaker.record_success()
+        metrics.inc('feeds.not_modified')
+        return None, True
+    parsed_feed = feed_fetcher.parse(result)
+    if parsed_feed.bozo and not parsed_feed.entries:
+        breaker.record_failure()
+        metrics.inc('feeds.failures')
+        logging.error(f"Error parsing feed {feed}: {parsed_feed.get('bozo_exception')}")
+        return None, True
+    breaker.record_success()
+    metrics.inc('feeds.fetched')
+    return parsed_feed, True
+
+def process_entries(feed, entries, snapshot=None):
+    """Queue the new magnets among a feed's entries, returning how many were queued"""
+    priority = (snapshot or config.snapshot()).feed_priority(feed)
+    queued = 0
+    for magnet in parse_magnets(entry.get('link', '') for entry in entries):
+        if magnet.key in history or magnet.key in admission_queue:
+            continue
+        if cluster is not None and not cluster.claim(magnet.key):
+            # Another instance already took this torrent
+            metrics.inc('cluster.claims_lost')
+            continue
+        if admission_queue.push(magnet.uri, priority, feed):
+            queued += 1
+    return queued
+
+def check_feeds(push_enabled=True):
+    """
+    Poll the configured feeds and admit their new magnets. Feeds are visited
+    in FeedScheduler order within the cycle's time budget (the cycle
+    deadline); those not reached go first next cycle. Without push_enabled
+    (no web server to receive WebSub callbacks) every feed is polled and no
+    hub subscriptions are made. The same goes for cluster mode, where
+    instances share the public URL but each keeps its own subscription
+    secrets, so a push could reach an instance unable to verify it.
+    """
+    push_enabled = push_enabled and cluster is None
+    with cycle_lock:
+        with job_deadline('cycle_deadline', CYCLE_DEADLINE):
+            queued = poll_feeds(push_enabled)
+        if queued:
+            admission_queue.save()
+        # The cycle's entries are persisted, so its validators may now go into warm-start snapshots
+        feed_fetcher.commit_validators()
+        # Admission gets its own budget rather than whatever the feeds left over
+        drain_queue()
+
+def poll_feeds(push_enabled):
+    # One snapshot for the whole cycle: feeds added or removed meanwhile apply to the next one
+    snapshot = config.snapshot()
+    queued = 0
+    public_url = snapshot.get('public_url')
+    feeds = snapshot.feeds
+    if cluster is not None:
+        cluster.heartbeat()
+        feeds = cluster.assigned(feeds)
+        logging.info(f"Checking {len(feeds)} of {len(snapshot.feeds)} feeds assigned to {cluster.node_id}")
+    feeds = feed_schedule.order(feeds, snapshot.feed_priority)
+    for index, feed in enumerate(feeds):
+        # The first feed always starts, so one slower than the whole budget is not deferred forever
+        if index and not feed_schedule.can_start(feed, deadline.remaining()):
+            defer_feeds(feeds[index:])
+            break
+        if push_enabled and not websub.should_poll(feed):
+            metrics.inc('feeds.push_subscribed_skips')
+            continue
+        started = time.monotonic()
+        parsed_feed, fetched = fetch_feed(feed)
+        if not fetched:
+            if deadline.expired():
+                defer_feeds(feeds[index:])
+                break
+            # Circuit open: no duration or yield to learn from, and the feed stays stale
+            continue
+        websub.polled(feed)
+        new_items = 0
+        if parsed_feed is not None:
+            if push_enabled:
+                websub.maybe_subscribe(feed, parsed_feed, public_url)
+            new_items = process_entries(feed, parsed_feed.entries, snapshot)
+            queued += new_items
+        feed_schedule.record(feed, new_items, time.monotonic() - started)
+    feed_schedule.prune(snapshot.feeds)
+    feed_schedule.save()
+    return queued
+
+def defer_feeds(feeds):
+    feed_schedule.defer(feeds)
+    metrics.inc('feeds.deferred', len(feeds))
+    logging.warning(f"Cycle budget used up, {len(feeds)} feeds left for the next cycle")
+
+def renew_websub():
+    websub.renew_due(config.get_public_url())
+
+def drain_queue():
+    """Admit queued magnets into Real-Debrid as active-torrent slots free up"""
+    if len(admission_queue) == 0:
+        return
+    with cycle_lock, job_deadline('job_deadline', JOB_DEADLINE):
+        pool = get_account_pool()
+
+        def on_added(item, torrent_id, account):
+            file_selector.track(torrent_id, account.name)
+            history.add({
+                'magnet': item['magnet'],
+                'torrent_id': torrent_id,
+                'account': account.name,
+                'feed': item.get('feed'),
+                'added_at': time.time()
+            })
+
+        if admission_queue.drain(pool, on_added):
+            history.save()
+            file_selector.save()
+
+def select_pending_files():
+    """Select files for every added torrent whose file list has become available"""
+    with job_deadline('job_deadline', JOB_DEADLINE):
+        file_selector.process(get_account_pool(), file_selection_rules.get())
+
+def retry_with_exponential_backoff(func, max_retries=5):
+    retries = 0
+    while retries < max_retries:
+        try:
+            return func()
+        except Exception as e:
+            wait_time = 2 ** retries
+            logging.error(f"Error: {e}. Retrying in {wait_time} seconds...")
+            time.sleep(wait_time)
+            retries += 1
+    raise Exception("Max retries exceeded")
+
+def run_cycle(push_enabled=True):
+    """One complete pass: poll feeds, admit queued magnets and select files"""
+    check_feeds(push_enabled)
+    select_pending_files()
+
+def schedule_jobs(scheduler, push_enabled=True, feed_interval=60):
+    """Register the periodic jobs on an APScheduler scheduler; feed_interval is in minutes"""
+    scheduler.add_job(check_feeds, 'interval', minutes=feed_interval, kwargs={'push_enabled': push_enabled})
+    scheduler.add_job(drain_queue, 'interval', minutes=5)
+    if push_enabled and cluster is None:
+        scheduler.add_job(renew_websub, 'interval', minutes=30)
+    scheduler.add_job(select_pending_files, 'interval', minutes=1)
+    scheduler.add_job(warm_start.save, 'interval', minutes=10)
+    if cluster is not None:
+        scheduler.add_job(cluster.maintain, 'interval', seconds=cluster.member_ttl / 3)
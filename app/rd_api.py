@@ -1,35 +1,135 @@
 import requests
+import threading
 import time
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Callable, Optional, Dict, Any, List, Tuple
+from circuit_breaker import CircuitBreakerRegistry
+from rate_limit import TokenBucket
+from magnet import parse_magnet
+import deadline
+import metrics
+
+# One breaker per endpoint group (torrents, hosts, settings, ...), shared by
+# every client so an outage seen by one request short-circuits the others.
+rd_breakers = CircuitBreakerRegistry(failure_rate=0.5, min_calls=3, window=10, reset_timeout=120)
+
+# Outcomes of add_magnet_result() other than success
+ADD_REJECTED = 'rejected'          # Real-Debrid refused the magnet itself; retrying will not help
+ADD_FULL = 'full'                  # the account has no free active-torrent slot
+ADD_UNAVAILABLE = 'unavailable'    # service down, circuit open or account unusable
+RD_TOO_MANY_ACTIVE_DOWNLOADS = 21
+
+
+class MetadataCache:
+    """
+    Real-Debrid metadata that changes rarely and is the same for every
+    account (hosts, domains, link regexes), kept for `ttl` seconds. Entries
+    carry wall-clock timestamps so they stay valid across restarts.
+    """
+
+    def __init__(self, ttl: float = 6 * 3600):
+        self.ttl = ttl
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, fetch: Callable[[], Any]) -> Any:
+        entry = self._entries.get(name)
+        if entry is not None and time.time() - entry['fetched_at'] < self.ttl:
+            metrics.inc('rd.metadata_cache.hits')
+            return entry['value']
+        value = fetch()
+        if value is not None:
+            with self._lock:
+                self._entries[name] = {'value': value, 'fetched_at': time.time()}
+        elif entry is not None:
+            # Serve the stale copy rather than nothing while Real-Debrid is failing
+            return entry['value']
+        return value
+
+    def export(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return dict(self._entries)
+
+    def restore(self, entries: Dict[str, Dict[str, Any]]) -> int:
+        """Take entries from a snapshot, stale ones included as a fallback; returns how many"""
+        restored = 0
+        with self._lock:
+            for name, entry in entries.items():
+                if name not in self._entries:
+                    self._entries[name] = entry
+                    restored += 1
+        return restored
+
+
+rd_metadata = MetadataCache()
 
 class RealDebridAPI:
-    def __init__(self, api_token: str, base_url: str = "https://api.real-debrid.com/rest/1.0"):
+    def __init__(self, api_token: str, base_url: str = "https://api.real-debrid.com/rest/1.0",
+                 breakers: CircuitBreakerRegistry = None, rate_limiter: TokenBucket = None):
         self.api_token = api_token
         self.base_url = base_url
+        self.breakers = breakers if breakers is not None else rd_breakers
+        self.rate_limiter = rate_limiter
         self.headers = {
             'Authorization': f'Bearer {api_token}',
             'Content-Type': 'application/json'
         }
 
+    @staticmethod
+    def endpoint_group(path: str) -> str:
+        """Group endpoints by their first path segment, e.g. /torrents/info/X -> torrents"""
+        return path.lstrip('/').split('/', 1)[0]
+
+    def _request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """
+        Perform a request through the circuit breaker of the endpoint group.
+        Raises requests.RequestException when the breaker is open so callers
+        handle it like any other failed call. The timeout comes from the
+        'rd.<group>' endpoint class, bounded by the current deadline.
+        """
+        group = self.endpoint_group(path)
+        breaker = self.breakers.get(f"rd:{group}")
+        if not breaker.allow_request():
+            metrics.inc(f"rd.{group}.short_circuited")
+            raise requests.RequestException(f"Circuit open for Real-Debrid '{group}' endpoints")
+        try:
+            if self.rate_limiter is not None and not self.rate_limiter.acquire(timeout=deadline.remaining()):
+                raise deadline.exceeded(f"waiting for the Real-Debrid rate limit ({group})")
+            kwargs.setdefault('timeout', deadline.timeout_for(f"rd.{group}"))
+            response = requests.request(method, f"{self.base_url}{path}", headers=self.headers, **kwargs)
+        except requests.RequestException as e:
+            if isinstance(e, deadline.DeadlineExceeded) or deadline.expired():
+                # Our own budget ran out; that says nothing about the endpoint's health
+                breaker.release()
+                metrics.inc(f"rd.{group}.deadline_exceeded")
+                raise
+            breaker.record_failure()
+            metrics.inc(f"rd.{group}.failures")
+            raise
+        if response.status_code >= 500 or response.status_code == 429:
+            breaker.record_failure()
+            metrics.inc(f"rd.{group}.failures")
+        else:
+            breaker.record_success()
+        metrics.inc(f"rd.{group}.calls")
+        return response
+
     def check_instant_availability(self, hash_or_magnet: str) -> Optional[Dict[str, Any]]:
         """
         Check instant availability for a specific hash/magnet instead of empty endpoint
         """
-        # Clean the hash/magnet input
         if hash_or_magnet.startswith('magnet:'):
-            # Extract hash from magnet link
-            try:
-                hash_part = hash_or_magnet.split('btih:')[1].split('&')[0].lower()
-            except IndexError:
+            magnet = parse_magnet(hash_or_magnet)
+            if magnet is None or magnet.infohash is None:
                 return None
+            hash_part = magnet.infohash
         else:
             hash_part = hash_or_magnet.lower()
 
         try:
-            response = requests.get(
-                f"{self.base_url}/torrents/instantAvailability/{hash_part}",
-                headers=self.headers
+            response = self._request(
+                'GET',
+                f"/torrents/instantAvailability/{hash_part}"
             )
             
             if response.status_code == 200:
@@ -47,9 +147,9 @@ class RealDebridAPI:
     def add_magnet(self, magnet_link: str) -> Optional[str]:
         """Add a magnet link to Real-Debrid"""
         try:
-            response = requests.post(
-                f"{self.base_url}/torrents/addMagnet",
-                headers=self.headers,
+            response = self._request(
+                'POST',
+                "/torrents/addMagnet",
                 data={'magnet': magnet_link}
             )
             if response.status_code == 201:
@@ -62,10 +162,10 @@ class RealDebridAPI:
     def select_files(self, torrent_id: str, file_ids: List[int] = None) -> bool:
         """Select files to download"""
         try:
-            data = {'files': ','.join(map(str, file_ids))} if file_ids else {'all': True}
-            response = requests.post(
-                f"{self.base_url}/torrents/selectFiles/{torrent_id}",
-                headers=self.headers,
+            data = {'files': ','.join(map(str, file_ids)) if file_ids else 'all'}
+            response = self._request(
+                'POST',
+                f"/torrents/selectFiles/{torrent_id}",
                 data=data
             )
             return response.status_code == 204
@@ -76,9 +176,9 @@ class RealDebridAPI:
     def get_user_info(self) -> Optional[Dict[str, Any]]:
         """Get current user info"""
         try:
-            response = requests.get(
-                f"{self.base_url}/user",
-                headers=self.headers
+            response = self._request(
+                'GET',
+                "/user"
             )
             if response.status_code == 200:
                 return response.json()
@@ -90,9 +190,9 @@ class RealDebridAPI:
     def unrestrict_link(self, link: str) -> Optional[Dict[str, Any]]:
         """Unrestrict a link"""
         try:
-            response = requests.post(
-                f"{self.base_url}/unrestrict/link",
-                headers=self.headers,
+            response = self._request(
+                'POST',
+                "/unrestrict/link",
                 data={'link': link}
             )
             if response.status_code == 200:
@@ -105,9 +205,9 @@ class RealDebridAPI:
     def get_traffic_info(self) -> Optional[Dict[str, Any]]:
         """Get traffic information for limited hosters"""
         try:
-            response = requests.get(
-                f"{self.base_url}/traffic",
-                headers=self.headers
+            response = self._request(
+                'GET',
+                "/traffic"
             )
             if response.status_code == 200:
                 return response.json()
@@ -119,9 +219,9 @@ class RealDebridAPI:
     def get_streaming_links(self, file_id: str) -> Optional[Dict[str, Any]]:
         """Get streaming links for a given file"""
         try:
-            response = requests.get(
-                f"{self.base_url}/streaming/transcode/{file_id}",
-                headers=self.headers
+            response = self._request(
+                'GET',
+                f"/streaming/transcode/{file_id}"
             )
             if response.status_code == 200:
                 return response.json()
@@ -133,9 +233,9 @@ class RealDebridAPI:
     def get_downloads_list(self) -> Optional[List[Dict[str, Any]]]:
         """Get user downloads list"""
         try:
-            response = requests.get(
-                f"{self.base_url}/downloads",
-                headers=self.headers
+            response = self._request(
+                'GET',
+                "/downloads"
             )
             if response.status_code == 200:
                 return response.json()
@@ -147,9 +247,9 @@ class RealDebridAPI:
     def delete_download(self, download_id: str) -> bool:
         """Delete a link from downloads list"""
         try:
-            response = requests.delete(
-                f"{self.base_url}/downloads/delete/{download_id}",
-                headers=self.headers
+            response = self._request(
+                'DELETE',
+                f"/downloads/delete/{download_id}"
             )
             return response.status_code == 204
         except requests.RequestException as e:
@@ -159,9 +259,9 @@ class RealDebridAPI:
     def get_supported_hosts(self) -> Optional[List[Dict[str, Any]]]:
         """Get supported hosts"""
         try:
-            response = requests.get(
-                f"{self.base_url}/hosts",
-                headers=self.headers
+            response = self._request(
+                'GET',
+                "/hosts"
             )
             if response.status_code == 200:
                 return response.json()
@@ -173,9 +273,9 @@ class RealDebridAPI:
     def get_user_settings(self) -> Optional[Dict[str, Any]]:
         """Get current user settings"""
         try:
-            response = requests.get(
-                f"{self.base_url}/settings",
-                headers=self.headers
+            response = self._request(
+                'GET',
+                "/settings"
             )
             if response.status_code == 200:
                 return response.json()
@@ -187,9 +287,9 @@ class RealDebridAPI:
     def update_user_settings(self, settings: Dict[str, Any]) -> bool:
         """Update user settings"""
         try:
-            response = requests.post(
-                f"{self.base_url}/settings/update",
-                headers=self.headers,
+            response = self._request(
+                'POST',
+                "/settings/update",
                 data=settings
             )
             return response.status_code == 204
@@ -200,9 +300,9 @@ class RealDebridAPI:
     def convert_fidelity_points(self) -> bool:
         """Convert fidelity points"""
         try:
-            response = requests.post(
-                f"{self.base_url}/settings/convertPoints",
-                headers=self.headers
+            response = self._request(
+                'POST',
+                "/settings/convertPoints"
             )
             return response.status_code == 204
         except requests.RequestException as e:
@@ -212,9 +312,9 @@ class RealDebridAPI:
     def change_password(self) -> bool:
         """Send verification email to change the password"""
         try:
-            response = requests.post(
-                f"{self.base_url}/settings/changePassword",
-                headers=self.headers
+            response = self._request(
+                'POST',
+                "/settings/changePassword"
             )
             return response.status_code == 204
         except requests.RequestException as e:
@@ -224,9 +324,9 @@ class RealDebridAPI:
     def upload_avatar(self, avatar_file: bytes) -> bool:
         """Upload avatar image"""
         try:
-            response = requests.put(
-                f"{self.base_url}/settings/avatar",
-                headers=self.headers,
+            response = self._request(
+                'PUT',
+                "/settings/avatar",
                 data=avatar_file
             )
             return response.status_code == 204
@@ -237,9 +337,9 @@ class RealDebridAPI:
     def delete_avatar(self) -> bool:
         """Reset user avatar"""
         try:
-            response = requests.delete(
-                f"{self.base_url}/settings/avatar",
-                headers=self.headers
+            response = self._request(
+                'DELETE',
+                "/settings/avatar"
             )
             return response.status_code == 204
         except requests.RequestException as e:
@@ -249,9 +349,9 @@ class RealDebridAPI:
     def get_server_time(self) -> Optional[Dict[str, Any]]:
         """Get server time"""
         try:
-            response = requests.get(
-                f"{self.base_url}/time",
-                headers=self.headers
+            response = self._request(
+                'GET',
+                "/time"
             )
             if response.status_code == 200:
                 return response.json()
@@ -263,9 +363,9 @@ class RealDebridAPI:
     def get_server_time_iso(self) -> Optional[Dict[str, Any]]:
         """Get server time in ISO"""
         try:
-            response = requests.get(
-                f"{self.base_url}/time/iso",
-                headers=self.headers
+            response = self._request(
+                'GET',
+                "/time/iso"
             )
             if response.status_code == 200:
                 return response.json()
@@ -277,9 +377,9 @@ class RealDebridAPI:
     def disable_access_token(self) -> bool:
         """Disable current access token"""
         try:
-            response = requests.get(
-                f"{self.base_url}/disable_access_token",
-                headers=self.headers
+            response = self._request(
+                'GET',
+                "/disable_access_token"
             )
             return response.status_code == 204
         except requests.RequestException as e:
@@ -289,9 +389,9 @@ class RealDebridAPI:
     def get_time(self) -> Optional[Dict[str, Any]]:
         """Get server time"""
         try:
-            response = requests.get(
-                f"{self.base_url}/time",
-                headers=self.headers
+            response = self._request(
+                'GET',
+                "/time"
             )
             if response.status_code == 200:
                 return response.json()
@@ -303,9 +403,9 @@ class RealDebridAPI:
     def get_time_iso(self) -> Optional[Dict[str, Any]]:
         """Get server time in ISO format"""
         try:
-            response = requests.get(
-                f"{self.base_url}/time/iso",
-                headers=self.headers
+            response = self._request(
+                'GET',
+                "/time/iso"
             )
             if response.status_code == 200:
                 return response.json()
@@ -317,24 +417,27 @@ class RealDebridAPI:
     def disable_access_token(self) -> bool:
         """Disable current access token"""
         try:
-            response = requests.get(
-                f"{self.base_url}/disable_access_token",
-                headers=self.headers
+            response = self._request(
+                'GET',
+                "/disable_access_token"
             )
             return response.status_code == 204
         except requests.RequestException as e:
             logging.error(f"Error disabling access token: {str(e)}")
             return False
 
-    def get_torrents_list(self) -> Optional[List[Dict[str, Any]]]:
-        """Get user torrents list"""
+    def get_torrents_list(self, limit: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+        """Get user torrents list, newest first (Real-Debrid returns 100 unless `limit` says otherwise)"""
         try:
-            response = requests.get(
-                f"{self.base_url}/torrents",
-                headers=self.headers
+            response = self._request(
+                'GET',
+                "/torrents",
+                params={'limit': limit} if limit else None
             )
             if response.status_code == 200:
                 return response.json()
+            if response.status_code == 204:
+                return []
             response.raise_for_status()
         except requests.RequestException as e:
             logging.error(f"Error getting torrents list: {str(e)}")
@@ -343,9 +446,9 @@ class RealDebridAPI:
     def get_torrent_info(self, torrent_id: str) -> Optional[Dict[str, Any]]:
         """Get info on a specific torrent"""
         try:
-            response = requests.get(
-                f"{self.base_url}/torrents/info/{torrent_id}",
-                headers=self.headers
+            response = self._request(
+                'GET',
+                f"/torrents/info/{torrent_id}"
             )
             if response.status_code == 200:
                 return response.json()
@@ -356,13 +459,18 @@ class RealDebridAPI:
 
     def get_active_torrents_count(self) -> Optional[int]:
         """Get the number of currently active torrents"""
+        active = self.get_active_torrents_limits()
+        return active.get('nb') if active else None
+
+    def get_active_torrents_limits(self) -> Optional[Dict[str, int]]:
+        """Get the number of active torrents ('nb') and the account limit ('limit')"""
         try:
-            response = requests.get(
-                f"{self.base_url}/torrents/activeCount",
-                headers=self.headers
+            response = self._request(
+                'GET',
+                "/torrents/activeCount"
             )
             if response.status_code == 200:
-                return response.json().get('count')
+                return response.json()
             response.raise_for_status()
         except requests.RequestException as e:
             logging.error(f"Error getting active torrents count: {str(e)}")
@@ -371,9 +479,9 @@ class RealDebridAPI:
     def get_available_hosts(self) -> Optional[List[str]]:
         """Get available hosts"""
         try:
-            response = requests.get(
-                f"{self.base_url}/torrents/availableHosts",
-                headers=self.headers
+            response = self._request(
+                'GET',
+                "/torrents/availableHosts"
             )
             if response.status_code == 200:
                 return response.json()
@@ -385,9 +493,9 @@ class RealDebridAPI:
     def add_torrent(self, torrent_file: bytes) -> Optional[str]:
         """Add a torrent file"""
         try:
-            response = requests.put(
-                f"{self.base_url}/torrents/addTorrent",
-                headers=self.headers,
+            response = self._request(
+                'PUT',
+                "/torrents/addTorrent",
                 data=torrent_file
             )
             if response.status_code == 201:
@@ -399,26 +507,44 @@ class RealDebridAPI:
 
     def add_magnet(self, magnet_link: str) -> Optional[str]:
         """Add a magnet link"""
+        return self.add_magnet_result(magnet_link)[0]
+
+    def add_magnet_result(self, magnet_link: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Add a magnet link, returning (torrent id, None) on success or
+        (None, ADD_REJECTED / ADD_FULL / ADD_UNAVAILABLE) telling whether the
+        magnet itself was refused or the account could not take it right now
+        """
         try:
-            response = requests.post(
-                f"{self.base_url}/torrents/addMagnet",
-                headers=self.headers,
+            response = self._request(
+                'POST',
+                "/torrents/addMagnet",
                 data={'magnet': magnet_link}
             )
-            if response.status_code == 201:
-                return response.json().get('id')
-            response.raise_for_status()
         except requests.RequestException as e:
             logging.error(f"Error adding magnet: {str(e)}")
-            return None
+            return None, ADD_UNAVAILABLE
+        if response.status_code == 201:
+            return response.json().get('id'), None
+        try:
+            error_code = response.json().get('error_code')
+        except ValueError:
+            error_code = None
+        logging.error(f"Error adding magnet: HTTP {response.status_code}, error code {error_code}")
+        if response.status_code in (429, 509) or error_code == RD_TOO_MANY_ACTIVE_DOWNLOADS:
+            return None, ADD_FULL
+        if response.status_code >= 500 or response.status_code in (401, 403):
+            # Server trouble, or a bad or locked API key: not the magnet's fault
+            return None, ADD_UNAVAILABLE
+        return None, ADD_REJECTED
 
     def select_files(self, torrent_id: str, file_ids: List[int] = None) -> bool:
         """Select files of a torrent"""
         try:
-            data = {'files': ','.join(map(str, file_ids))} if file_ids else {'all': True}
-            response = requests.post(
-                f"{self.base_url}/torrents/selectFiles/{torrent_id}",
-                headers=self.headers,
+            data = {'files': ','.join(map(str, file_ids)) if file_ids else 'all'}
+            response = self._request(
+                'POST',
+                f"/torrents/selectFiles/{torrent_id}",
                 data=data
             )
             return response.status_code == 204
@@ -429,9 +555,9 @@ class RealDebridAPI:
     def delete_torrent(self, torrent_id: str) -> bool:
         """Delete a torrent from torrents list"""
         try:
-            response = requests.delete(
-                f"{self.base_url}/torrents/delete/{torrent_id}",
-                headers=self.headers
+            response = self._request(
+                'DELETE',
+                f"/torrents/delete/{torrent_id}"
             )
             return response.status_code == 204
         except requests.RequestException as e:
@@ -441,9 +567,9 @@ class RealDebridAPI:
     def get_supported_hosts(self) -> Optional[List[Dict[str, Any]]]:
         """Get supported hosts"""
         try:
-            response = requests.get(
-                f"{self.base_url}/hosts",
-                headers=self.headers
+            response = self._request(
+                'GET',
+                "/hosts"
             )
             if response.status_code == 200:
                 return response.json()
@@ -455,9 +581,9 @@ class RealDebridAPI:
     def get_host_status(self) -> Optional[Dict[str, Any]]:
         """Get status of hosters"""
         try:
-            response = requests.get(
-                f"{self.base_url}/hosts/status",
-                headers=self.headers
+            response = self._request(
+                'GET',
+                "/hosts/status"
             )
             if response.status_code == 200:
                 return response.json()
@@ -469,9 +595,9 @@ class RealDebridAPI:
     def get_supported_regex(self) -> Optional[List[str]]:
         """Get all supported regex"""
         try:
-            response = requests.get(
-                f"{self.base_url}/hosts/regex",
-                headers=self.headers
+            response = self._request(
+                'GET',
+                "/hosts/regex"
             )
             if response.status_code == 200:
                 return response.json()
@@ -483,9 +609,9 @@ class RealDebridAPI:
     def get_supported_regex_folder(self) -> Optional[List[str]]:
         """Get all supported regex for folder links"""
         try:
-            response = requests.get(
-                f"{self.base_url}/hosts/regexFolder",
-                headers=self.headers
+            response = self._request(
+                'GET',
+                "/hosts/regexFolder"
             )
             if response.status_code == 200:
                 return response.json()
@@ -497,9 +623,9 @@ class RealDebridAPI:
     def get_supported_domains(self) -> Optional[List[str]]:
         """Get all supported domains"""
         try:
-            response = requests.get(
-                f"{self.base_url}/hosts/domains",
-                headers=self.headers
+            response = self._request(
+                'GET',
+                "/hosts/domains"
             )
             if response.status_code == 200:
                 return response.json()
@@ -511,9 +637,9 @@ class RealDebridAPI:
     def get_user_settings(self) -> Optional[Dict[str, Any]]:
         """Get current user settings"""
         try:
-            response = requests.get(
-                f"{self.base_url}/settings",
-                headers=self.headers
+            response = self._request(
+                'GET',
+                "/settings"
             )
             if response.status_code == 200:
                 return response.json()
@@ -525,9 +651,9 @@ class RealDebridAPI:
     def update_user_settings(self, settings: Dict[str, Any]) -> bool:
         """Update user settings"""
         try:
-            response = requests.post(
-                f"{self.base_url}/settings/update",
-                headers=self.headers,
+            response = self._request(
+                'POST',
+                "/settings/update",
                 data=settings
             )
             return response.status_code == 204
@@ -538,9 +664,9 @@ class RealDebridAPI:
     def convert_fidelity_points(self) -> bool:
         """Convert fidelity points"""
         try:
-            response = requests.post(
-                f"{self.base_url}/settings/convertPoints",
-                headers=self.headers
+            response = self._request(
+                'POST',
+                "/settings/convertPoints"
             )
             return response.status_code == 204
         except requests.RequestException as e:
@@ -550,9 +676,9 @@ class RealDebridAPI:
     def change_password(self) -> bool:
         """Send verification email to change the password"""
         try:
-            response = requests.post(
-                f"{self.base_url}/settings/changePassword",
-                headers=self.headers
+            response = self._request(
+                'POST',
+                "/settings/changePassword"
             )
             return response.status_code == 204
         except requests.RequestException as e:
@@ -562,9 +688,9 @@ class RealDebridAPI:
     def upload_avatar(self, avatar_file: bytes) -> bool:
         """Upload avatar image"""
         try:
-            response = requests.put(
-                f"{self.base_url}/settings/avatar",
-                headers=self.headers,
+            response = self._request(
+                'PUT',
+                "/settings/avatar",
                 data=avatar_file
             )
             return response.status_code == 204
@@ -575,9 +701,9 @@ class RealDebridAPI:
     def delete_avatar(self) -> bool:
         """Reset user avatar"""
         try:
-            response = requests.delete(
-                f"{self.base_url}/settings/avatar",
-                headers=self.headers
+            response = self._request(
+                'DELETE',
+                "/settings/avatar"
             )
             return response.status_code == 204
         except requests.RequestException as e:
@@ -587,9 +713,9 @@ class RealDebridAPI:
     def get_server_time(self) -> Optional[Dict[str, Any]]:
         """Get server time"""
         try:
-            response = requests.get(
-                f"{self.base_url}/time",
-                headers=self.headers
+            response = self._request(
+                'GET',
+                "/time"
             )
             if response.status_code == 200:
                 return response.json()
@@ -601,9 +727,9 @@ class RealDebridAPI:
     def get_server_time_iso(self) -> Optional[Dict[str, Any]]:
         """Get server time in ISO"""
         try:
-            response = requests.get(
-                f"{self.base_url}/time/iso",
-                headers=self.headers
+            response = self._request(
+                'GET',
+                "/time/iso"
             )
             if response.status_code == 200:
                 return response.json()
@@ -615,9 +741,9 @@ class RealDebridAPI:
     def disable_access_token(self) -> bool:
         """Disable current access token"""
         try:
-            response = requests.get(
-                f"{self.base_url}/disable_access_token",
-                headers=self.headers
+            response = self._request(
+                'GET',
+                "/disable_access_token"
             )
             return response.status_code == 204
         except requests.RequestException as e:
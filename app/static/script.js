@@ -14,6 +14,11 @@ document.addEventListener('DOMContentLoaded', function() {
         addFeedBtn.addEventListener('click', addFeed);
     }
 
+    const importFeedsBtn = document.getElementById('import-feeds-btn');
+    if (importFeedsBtn) {
+        importFeedsBtn.addEventListener('click', importFeeds);
+    }
+
     // Settings management
     const saveSettingsBtn = document.getElementById('save-settings-btn');
     if (saveSettingsBtn) {
@@ -31,8 +36,193 @@ document.addEventListener('DOMContentLoaded', function() {
     if (callApiBtn) {
         callApiBtn.addEventListener('click', callApi);
     }
+
+    // Paginated feed and torrent history lists
+    const feedList = document.getElementById('feed-list');
+    if (feedList) {
+        new VirtualList(feedList, '/api/feeds', renderFeedRow).reset({});
+    }
+
+    const historyList = document.getElementById('history-list');
+    if (historyList) {
+        initHistory(historyList);
+    }
 });
 
+/*
+ * Windowed list over a cursor-paginated endpoint. Only the rows in view
+ * (plus a small overscan) exist in the DOM; further pages are fetched as
+ * the user scrolls towards the end of what has been loaded.
+ */
+class VirtualList {
+    constructor(container, endpoint, renderRow, options = {}) {
+        this.container = container;
+        this.endpoint = endpoint;
+        this.renderRow = renderRow;
+        this.rowHeight = options.rowHeight || 48;
+        this.pageSize = options.pageSize || 100;
+        this.overscan = options.overscan || 10;
+        this.onLoad = options.onLoad || null;
+        this.generation = 0;
+
+        this.spacer = document.createElement('div');
+        this.spacer.className = 'virtual-spacer';
+        this.rows = document.createElement('div');
+        this.rows.className = 'virtual-rows';
+        this.spacer.appendChild(this.rows);
+        this.container.appendChild(this.spacer);
+
+        this.renderScheduled = false;
+        this.container.addEventListener('scroll', () => this.scheduleRender());
+        window.addEventListener('resize', () => this.scheduleRender());
+    }
+
+    reset(params) {
+        this.params = params;
+        this.items = [];
+        this.total = 0;
+        this.cursor = null;
+        this.done = false;
+        this.loading = false;
+        this.generation += 1;
+        this.container.scrollTop = 0;
+        this.loadMore();
+    }
+
+    loadMore() {
+        if (this.loading || this.done) {
+            return;
+        }
+        this.loading = true;
+        const generation = this.generation;
+        const query = new URLSearchParams(Object.assign({ limit: this.pageSize }, this.params));
+        if (this.cursor) {
+            query.set('cursor', this.cursor);
+        }
+
+        fetch(`${this.endpoint}?${query}`)
+        .then(response => response.json())
+        .then(data => {
+            if (generation !== this.generation) {
+                return; // Parameters changed while this page was in flight
+            }
+            this.items.push(...data.items);
+            this.total = data.total;
+            this.cursor = data.next_cursor;
+            this.done = !data.next_cursor;
+            this.loading = false;
+            if (this.onLoad) {
+                this.onLoad(this);
+            }
+            this.render();
+        })
+        .catch(error => {
+            this.loading = false;
+            showAlert('Error loading list');
+        });
+    }
+
+    scheduleRender() {
+        if (!this.renderScheduled) {
+            this.renderScheduled = true;
+            requestAnimationFrame(() => {
+                this.renderScheduled = false;
+                this.render();
+            });
+        }
+    }
+
+    render() {
+        if (this.total === 0 && this.done) {
+            this.spacer.style.height = 'auto';
+            const empty = document.createElement('p');
+            empty.className = 'no-feeds';
+            empty.textContent = this.container.dataset.empty || 'Nothing here yet.';
+            this.rows.style.transform = '';
+            this.rows.replaceChildren(empty);
+            return;
+        }
+
+        this.spacer.style.height = `${this.total * this.rowHeight}px`;
+        const scrollTop = this.container.scrollTop;
+        const first = Math.max(0, Math.floor(scrollTop / this.rowHeight) - this.overscan);
+        const last = Math.min(this.total,
+            Math.ceil((scrollTop + this.container.clientHeight) / this.rowHeight) + this.overscan);
+
+        if (last > this.items.length) {
+            this.loadMore();
+        }
+
+        const fragment = document.createDocumentFragment();
+        this.items.slice(first, last).forEach(item => {
+            const row = this.renderRow(item);
+            row.classList.add('virtual-row');
+            row.style.height = `${this.rowHeight}px`;
+            fragment.appendChild(row);
+        });
+        this.rows.style.transform = `translateY(${first * this.rowHeight}px)`;
+        this.rows.replaceChildren(fragment);
+    }
+}
+
+function renderFeedRow(feed) {
+    const row = document.createElement('div');
+    row.className = 'feed-row';
+
+    const url = document.createElement('span');
+    url.className = 'feed-url';
+    url.textContent = feed.url;
+    url.title = feed.url;
+
+    const remove = document.createElement('button');
+    remove.className = 'button button-danger';
+    remove.textContent = 'Remove';
+    remove.addEventListener('click', () => removeFeed(feed.id));
+
+    row.append(url, remove);
+    return row;
+}
+
+function renderTorrentRow(torrent) {
+    const row = document.createElement('div');
+    row.className = 'feed-row';
+
+    const name = document.createElement('span');
+    name.className = 'feed-url';
+    name.textContent = torrent.name;
+    name.title = torrent.feed || '';
+
+    const added = document.createElement('span');
+    added.className = 'torrent-added';
+    added.textContent = torrent.added_at ? new Date(torrent.added_at * 1000).toLocaleString() : '';
+
+    row.append(name, added);
+    return row;
+}
+
+function initHistory(container) {
+    const search = document.getElementById('history-search');
+    const sort = document.getElementById('history-sort');
+    const order = document.getElementById('history-order');
+    const total = document.getElementById('history-total');
+
+    const list = new VirtualList(container, '/api/torrents', renderTorrentRow, {
+        onLoad: list => {
+            total.textContent = `${list.total} torrents`;
+        }
+    });
+    const reload = () => list.reset({ q: search.value.trim(), sort: sort.value, order: order.value });
+
+    let searchTimer = null;
+    search.addEventListener('input', () => {
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(reload, 250);
+    });
+    sort.addEventListener('change', reload);
+    order.addEventListener('change', reload);
+    reload();
+}
+
 function addFeed() {
     const url = document.getElementById('feed-url').value;
     if (!url) {
@@ -58,6 +248,30 @@ function addFeed() {
     .catch(error => showAlert('Error adding feed'));
 }
 
+function importFeeds() {
+    const file = document.getElementById('feed-import-file').files[0];
+    if (!file) {
+        showAlert('Please choose a file to import');
+        return;
+    }
+
+    showAlert('Importing and validating feeds...');
+    fetch('/api/feeds/import', {
+        method: 'POST',
+        body: file
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.status === 'success') {
+            showAlert(`Imported ${data.added.length} feeds (${data.unvalidated.length} not validated in time), ${data.duplicates} duplicates, ${data.invalid.length} invalid`);
+            setTimeout(() => window.location.reload(), 1500);
+        } else {
+            showAlert('Failed to import feeds: ' + data.message);
+        }
+    })
+    .catch(error => showAlert('Error importing feeds'));
+}
+
 function removeFeed(id) {
     if (confirm('Are you sure you want to remove this feed?')) {
         fetch(`/api/feeds/${id}`, {
@@ -76,18 +290,29 @@ function removeFeed(id) {
 }
 
 function saveSettings() {
-    const rdApiKey = document.getElementById('rd-api-key').value;
+    const newApiKey = document.getElementById('rd-new-api-key').value.trim();
+    const removeAccounts = Array.from(document.querySelectorAll('.remove-account:checked'))
+        .map(checkbox => checkbox.value);
+    const publicUrl = document.getElementById('public-url').value;
     
     fetch('/api/settings', {
         method: 'POST',
         headers: {
             'Content-Type': 'application/json'
         },
-        body: JSON.stringify({ rd_api_key: rdApiKey })
+        body: JSON.stringify({
+            add_rd_api_keys: newApiKey ? [newApiKey] : [],
+            remove_rd_accounts: removeAccounts,
+            public_url: publicUrl
+        })
     })
     .then(response => response.json())
     .then(data => {
         if (data.status === 'success') {
+            if (newApiKey || removeAccounts.length) {
+                window.location.reload();
+                return;
+            }
             showAlert('Settings saved successfully');
         } else {
             showAlert('Failed to save settings');
@@ -103,7 +328,7 @@ function refreshFeeds() {
     .then(response => response.json())
     .then(data => {
         if (data.status === 'success') {
-            showAlert('Feeds refreshed successfully');
+            showAlert('Feed check started');
         } else {
             showAlert('Failed to refresh feeds');
         }
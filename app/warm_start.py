@@ -0,0 +1,104 @@
+import json
+import logging
+import os
+import threading
+import zlib
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MAGIC = b'RDWS'
+# Bump when the layout of any section changes; older snapshots are then ignored
+FORMAT_VERSION = 1
+CODEC_MSGPACK = b'M'
+CODEC_JSON = b'J'
+
+
+def encode(data: Dict[str, Any]) -> bytes:
+    """Header (magic, format version, codec) followed by the zlib-compressed payload"""
+    if msgpack is not None:
+        codec, payload = CODEC_MSGPACK, msgpack.packb(data, use_bin_type=True)
+    else:
+        codec, payload = CODEC_JSON, json.dumps(data).encode('utf-8')
+    return MAGIC + bytes([FORMAT_VERSION]) + codec + zlib.compress(payload)
+
+
+def decode(blob: bytes) -> Optional[Dict[str, Any]]:
+    """Decode a snapshot, or None if it is from another format version or cannot be read here"""
+    if blob[:4] != MAGIC or len(blob) < 6 or blob[4] != FORMAT_VERSION:
+        return None
+    codec = blob[5:6]
+    if codec == CODEC_MSGPACK and msgpack is not None:
+        return msgpack.unpackb(zlib.decompress(blob[6:]), raw=False)
+    if codec == CODEC_JSON:
+        return json.loads(zlib.decompress(blob[6:]).decode('utf-8'))
+    return None
+
+
+class WarmStart:
+    """
+    Binary snapshot (config/warm_start.bin) of in-memory state that is
+    expensive to rebuild or would otherwise be refetched after a restart.
+    Components register a section with an export and a restore callback;
+    save() collects every section into one file, written atomically, and
+    restore() hands each section back. msgpack is used when installed,
+    zlib-compressed JSON otherwise.
+    """
+
+    def __init__(self, path: str = 'config/warm_start.bin'):
+        self.path = path
+        self._sections: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, export: Callable[[], Any], restore: Callable[[Any], Any]):
+        self._sections[name] = (export, restore)
+
+    def save(self) -> bool:
+        with self._lock:
+            data = {}
+            for name, (export, _) in self._sections.items():
+                state = export()
+                if state is not None:
+                    data[name] = state
+            tmp_path = self.path + '.tmp'
+            try:
+                with open(tmp_path, 'wb') as f:
+                    f.write(encode(data))
+                os.replace(tmp_path, self.path)
+            except (OSError, TypeError, ValueError) as e:
+                logging.error(f"Error writing warm-start snapshot: {str(e)}")
+                return False
+            return True
+
+    def load(self) -> Dict[str, Any]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'rb') as f:
+                data = decode(f.read())
+        except (OSError, ValueError, zlib.error) as e:
+            logging.error(f"Error reading warm-start snapshot: {str(e)}")
+            return {}
+        if data is None:
+            logging.info(f"Ignoring warm-start snapshot {self.path} from another format version")
+            return {}
+        return data
+
+    def restore(self) -> Dict[str, Any]:
+        """
+        Hand each registered section its snapshotted state; returns what each
+        restore callback returned, which is falsy when it took nothing
+        """
+        data = self.load()
+        results = {}
+        for name, (_, restore) in self._sections.items():
+            if name not in data:
+                continue
+            try:
+                results[name] = restore(data[name])
+            except (KeyError, TypeError, ValueError) as e:
+                logging.error(f"Error restoring warm-start section '{name}': {str(e)}")
+        return results
@@ -0,0 +1,203 @@
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+
+import deadline
+
+PENDING = 'pending'
+ACTIVE = 'active'
+
+
+def discover_hub(parsed_feed) -> Tuple[Optional[str], Optional[str]]:
+    """Return the (hub, self) URLs advertised by a parsed feed's rel="hub" / rel="self" links"""
+    hub = topic = None
+    for link in parsed_feed.feed.get('links', []):
+        if link.get('rel') == 'hub' and not hub:
+            hub = link.get('href')
+        elif link.get('rel') == 'self' and not topic:
+            topic = link.get('href')
+    return hub, topic
+
+
+def subscription_id(feed: str) -> str:
+    return hashlib.sha1(feed.encode('utf-8')).hexdigest()[:16]
+
+
+class WebSubManager:
+    """
+    WebSub (PubSubHubbub) subscriber. Feeds that advertise a hub are
+    subscribed with a per-subscription secret; the hub verifies the intent
+    via GET on the callback and then pushes new content via signed POSTs.
+    Subscribed feeds only need a slow safety poll.
+    """
+
+    def __init__(self, state_file: str = 'config/websub.json', lease_seconds: int = 86400,
+                 renew_margin: int = 3600, safety_interval: int = 24 * 3600,
+                 retry_interval: int = 3600, endpoint_class: str = 'websub'):
+        self.state_file = state_file
+        self.lease_seconds = lease_seconds
+        self.renew_margin = renew_margin
+        self.safety_interval = safety_interval
+        self.retry_interval = retry_interval
+        self.endpoint_class = endpoint_class
+        self._lock = threading.RLock()
+        self.subscriptions: Dict[str, Dict[str, Any]] = {}
+        self.load()
+
+    def load(self):
+        if os.path.exists(self.state_file):
+            with open(self.state_file, 'r') as f:
+                self.subscriptions = json.load(f)
+
+    def save(self):
+        with self._lock:
+            with open(self.state_file, 'w') as f:
+                json.dump(self.subscriptions, f)
+
+    def get(self, sub_id: str) -> Optional[Dict[str, Any]]:
+        return self.subscriptions.get(sub_id)
+
+    def is_subscribed(self, feed: str) -> bool:
+        subscription = self.subscriptions.get(subscription_id(feed))
+        return bool(subscription and subscription['state'] == ACTIVE
+                    and subscription.get('lease_expires', 0) > time.time())
+
+    def should_poll(self, feed: str) -> bool:
+        """Unsubscribed feeds are always polled; subscribed ones only every safety_interval"""
+        if not self.is_subscribed(feed):
+            return True
+        subscription = self.subscriptions[subscription_id(feed)]
+        return time.time() - subscription.get('last_polled', 0) >= self.safety_interval
+
+    def polled(self, feed: str):
+        subscription = self.subscriptions.get(subscription_id(feed))
+        if subscription is not None:
+            subscription['last_polled'] = time.time()
+
+    def _request(self, mode: str, subscription: Dict[str, Any], callback_base: str) -> bool:
+        callback = f"{callback_base.rstrip('/')}/websub/callback/{subscription_id(subscription['feed'])}"
+        data = {
+            'hub.mode': mode,
+            'hub.topic': subscription['topic'],
+            'hub.callback': callback
+        }
+        if mode == 'subscribe':
+            data['hub.lease_seconds'] = str(self.lease_seconds)
+            data['hub.secret'] = subscription['secret']
+        try:
+            response = requests.post(subscription['hub'], data=data,
+                                     timeout=deadline.timeout_for(self.endpoint_class))
+        except requests.RequestException as e:
+            logging.error(f"Error sending WebSub {mode} for {subscription['topic']}: {str(e)}")
+            return False
+        if response.status_code not in (202, 204):
+            logging.error(f"WebSub hub rejected {mode} for {subscription['topic']}: HTTP {response.status_code}")
+            return False
+        return True
+
+    def maybe_subscribe(self, feed: str, parsed_feed, callback_base: Optional[str]) -> bool:
+        """Subscribe to the feed's hub if it advertises one and we are not already (being) subscribed"""
+        if not callback_base:
+            return False
+        hub, topic = discover_hub(parsed_feed)
+        if not hub:
+            return False
+        sub_id = subscription_id(feed)
+        with self._lock:
+            subscription = self.subscriptions.get(sub_id)
+            if subscription and subscription['hub'] == hub:
+                if subscription['state'] == ACTIVE or time.time() - subscription['requested_at'] < self.retry_interval:
+                    return False
+            subscription = {
+                'feed': feed,
+                'hub': hub,
+                'topic': topic or feed,
+                'secret': secrets.token_hex(20),
+                'state': PENDING,
+                'mode': 'subscribe',
+                'requested_at': time.time(),
+                'last_polled': time.time()
+            }
+            self.subscriptions[sub_id] = subscription
+            self.save()
+        return self._request('subscribe', subscription, callback_base)
+
+    def renew_due(self, callback_base: Optional[str]) -> int:
+        """Re-subscribe every active subscription whose lease ends within renew_margin"""
+        if not callback_base:
+            return 0
+        renewed = 0
+        now = time.time()
+        for subscription in list(self.subscriptions.values()):
+            if subscription['state'] == ACTIVE and subscription.get('lease_expires', 0) - now < self.renew_margin:
+                subscription['mode'] = 'subscribe'
+                subscription['requested_at'] = now
+                if self._request('subscribe', subscription, callback_base):
+                    renewed += 1
+        if renewed:
+            self.save()
+        return renewed
+
+    def unsubscribe(self, feed: str, callback_base: Optional[str]):
+        with self._lock:
+            subscription = self.subscriptions.get(subscription_id(feed))
+            if subscription is None:
+                return
+            subscription['mode'] = 'unsubscribe'
+            self.save()
+        if callback_base:
+            self._request('unsubscribe', subscription, callback_base)
+
+    def verify_intent(self, sub_id: str, args) -> Optional[str]:
+        """
+        Handle the hub's verification GET. Returns the challenge to echo back
+        when the request matches a subscription we asked for, otherwise None.
+        """
+        with self._lock:
+            subscription = self.subscriptions.get(sub_id)
+            mode = args.get('hub.mode')
+            if (subscription is None or args.get('hub.topic') != subscription['topic']
+                    or mode != subscription.get('mode')):
+                return None
+            if mode == 'unsubscribe':
+                del self.subscriptions[sub_id]
+            else:
+                try:
+                    lease = int(args.get('hub.lease_seconds') or self.lease_seconds)
+                except ValueError:
+                    logging.warning(f"Rejected WebSub verification with lease {args.get('hub.lease_seconds')!r}")
+                    return None
+                if lease <= 0:
+                    return None
+                subscription['state'] = ACTIVE
+                subscription['lease_expires'] = time.time() + lease
+                logging.info(f"WebSub subscription active for {subscription['feed']} ({lease}s lease)")
+            self.save()
+            return args.get('hub.challenge')
+
+    def verify_content(self, sub_id: str, body: bytes, signature: Optional[str]) -> Optional[str]:
+        """Check the X-Hub-Signature of pushed content, returning the feed URL if it is authentic"""
+        subscription = self.subscriptions.get(sub_id)
+        if subscription is None or subscription['state'] != ACTIVE or not signature or '=' not in signature:
+            return None
+        algorithm, digest = signature.split('=', 1)
+        if algorithm not in ('sha1', 'sha256', 'sha384', 'sha512'):
+            return None
+        expected = hmac.new(subscription['secret'].encode('utf-8'), body, algorithm).hexdigest()
+        if not hmac.compare_digest(expected, digest):
+            logging.warning(f"Rejected WebSub push with a bad signature for {subscription['feed']}")
+            return None
+        subscription['last_push'] = time.time()
+        return subscription['feed']
+
+    def snapshot(self):
+        return [{key: value for key, value in subscription.items() if key != 'secret'}
+                for subscription in self.subscriptions.values()]